@@ -1,44 +1,124 @@
 #!/usr/bin/env python3
 """FastAPI server for the QA Chain application."""
 
+import json
+import logging
+import math
 import os
-import sys
 import time
-from pathlib import Path
+from contextlib import asynccontextmanager
 from typing import Optional
 from uuid import uuid4
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
-
-from qa_chain import QAConfig, SecurityError, answer_question
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+
+from qa_chain import (
+    QAConfig,
+    SecurityError,
+    aclose_clients,
+    answer_question_async,
+    astream_answer,
+    awarm_up,
+)
+from qa_chain.batching import BatchedAnswerer
 from qa_chain.logging_config import get_logger, request_id_var, setup_logging
+from qa_chain.rate_limiter import RateLimiter
+from qa_chain.retry import interrupt_retries, resume_retries
+from qa_chain.security import OutputStreamSanitizer, sanitize_output
 
 # Initialize logging
 setup_logging()
 logger = get_logger(__name__)
 
+# Opt-in micro-batching of concurrent /answer requests into shared LLM calls
+_batcher: Optional[BatchedAnswerer] = (
+    BatchedAnswerer(
+        max_batch_size=int(os.getenv("QA_BATCH_SIZE", 16)),
+        max_wait_ms=float(os.getenv("QA_BATCH_WAIT_MS", 20)),
+    )
+    if os.getenv("QA_ENABLE_BATCHING", "false").lower() == "true"
+    else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background workers with the application."""
+    # A previous shutdown in this process may have interrupted retries
+    resume_retries()
+    # Build the client and open a pooled connection ahead of traffic. Idle
+    # connections expire after 60s (keepalive_expiry in qa_chain.chain), so
+    # only a first request within that window reuses the warmed socket; later
+    # ones still skip client construction but reconnect
+    if os.getenv("OPENAI_API_KEY") or os.getenv("AZURE_OPENAI_API_KEY"):
+        await awarm_up()
+    if _batcher is not None:
+        _batcher.start()
+    yield
+    # Don't let a pending sync retry backoff hold up shutdown
+    interrupt_retries()
+    if _batcher is not None:
+        await _batcher.stop()
+    await aclose_clients()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="QA Chain API",
     description="API for question-answering using context",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Add CORS middleware for browser access
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+
+# Per-client rate limiting, applied before the request body is read
+_RATE_LIMITED_PATHS = frozenset({"/answer", "/answer/stream"})
+_rate_limiter = RateLimiter(
+    max_requests=int(os.getenv("QA_RATE_LIMIT_REQUESTS", 20)),
+    window_seconds=int(os.getenv("QA_RATE_LIMIT_WINDOW", 60)),
 )
 
 
+def _client_key(request: Request) -> str:
+    """Identify the caller by client address.
+
+    Request headers such as ``Authorization`` are not validated by this
+    server, so keying on them would let a client dodge its limit by sending a
+    fresh value with every request.
+    """
+    return request.client.host if request.client else "anonymous"
+
+
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    """Reject over-limit clients before their request body is parsed."""
+    if request.url.path in _RATE_LIMITED_PATHS:
+        allowed, retry_after = _rate_limiter.is_allowed(_client_key(request))
+        if not allowed:
+            logger.warning(
+                "Rate limit exceeded for %s",
+                request.url.path,
+                extra={
+                    "extra_fields": {"error_type": "rate_limit", "status_code": 429}
+                },
+            )
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "detail": (
+                        f"Rate limit exceeded. "
+                        f"Please retry after {retry_after:.1f} seconds."
+                    ),
+                    "error_type": "rate_limit",
+                },
+                headers={"Retry-After": str(math.ceil(retry_after or 0))},
+            )
+    return await call_next(request)
+
+
 # Middleware for request ID tracking
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
@@ -46,44 +126,54 @@ async def add_request_id(request: Request, call_next):
     request_id = request.headers.get("X-Request-ID", str(uuid4()))
     token = request_id_var.set(request_id)
 
-    start_time = time.time()
-    logger.info(
-        f"Request started: {request.method} {request.url.path}",
-        extra={
-            "extra_fields": {
-                "method": request.method,
-                "path": request.url.path,
-                "request_id": request_id,
-            }
-        },
-    )
-
-    try:
-        response = await call_next(request)
-        elapsed = time.time() - start_time
+    start_ns = time.perf_counter_ns()
+    if logger.isEnabledFor(logging.INFO):
         logger.info(
-            f"Request completed: {request.method} {request.url.path} - {response.status_code}",
+            "Request started: %s %s",
+            request.method,
+            request.url.path,
             extra={
                 "extra_fields": {
                     "method": request.method,
                     "path": request.url.path,
-                    "status_code": response.status_code,
-                    "duration_ms": int(elapsed * 1000),
                     "request_id": request_id,
                 }
             },
         )
+
+    try:
+        response = await call_next(request)
+        if logger.isEnabledFor(logging.INFO):
+            elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            logger.info(
+                "Request completed: %s %s - %d",
+                request.method,
+                request.url.path,
+                response.status_code,
+                extra={
+                    "extra_fields": {
+                        "method": request.method,
+                        "path": request.url.path,
+                        "status_code": response.status_code,
+                        "duration_ms": elapsed_ms,
+                        "request_id": request_id,
+                    }
+                },
+            )
         response.headers["X-Request-ID"] = request_id
         return response
     except Exception as e:
-        elapsed = time.time() - start_time
+        elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         logger.error(
-            f"Request failed: {request.method} {request.url.path} - {str(e)}",
+            "Request failed: %s %s - %s",
+            request.method,
+            request.url.path,
+            e,
             extra={
                 "extra_fields": {
                     "method": request.method,
                     "path": request.url.path,
-                    "duration_ms": int(elapsed * 1000),
+                    "duration_ms": elapsed_ms,
                     "error": str(e),
                     "request_id": request_id,
                 }
@@ -95,9 +185,22 @@ async def add_request_id(request: Request, call_next):
         request_id_var.reset(token)
 
 
+# Add CORS middleware for browser access. Added after the other middleware so
+# it is outermost and also covers rate-limit rejections.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Configure appropriately for production
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
 class QARequest(BaseModel):
     """Request model for question-answering."""
 
+    model_config = ConfigDict(extra="forbid")
+
     question: str = Field(
         ..., min_length=1, max_length=1000, description="The question to answer"
     )
@@ -121,6 +224,14 @@ class QAResponse(BaseModel):
     model: str = Field(..., description="Model used")
 
 
+class HealthResponse(BaseModel):
+    """Response model for the health check."""
+
+    status: str = Field(..., description="healthy or unhealthy")
+    api_key_configured: bool = Field(..., description="Whether an API key is set")
+    message: str = Field(..., description="Human-readable status")
+
+
 class ErrorResponse(BaseModel):
     """Error response model."""
 
@@ -140,25 +251,26 @@ async def root():
     }
 
 
-@app.get("/health")
-async def health():
+@app.get("/health", response_model=HealthResponse)
+async def health() -> HealthResponse:
     """Health check endpoint."""
     # Check if API key is configured
     api_key = os.getenv("OPENAI_API_KEY") or os.getenv("AZURE_OPENAI_API_KEY")
 
     status = "healthy" if api_key else "unhealthy"
     logger.info(
-        f"Health check: {status}",
+        "Health check: %s",
+        status,
         extra={"extra_fields": {"api_key_configured": bool(api_key)}},
     )
 
-    return {
-        "status": status,
-        "api_key_configured": bool(api_key),
-        "message": (
+    return HealthResponse(
+        status=status,
+        api_key_configured=bool(api_key),
+        message=(
             "API key not configured" if not api_key else "Ready to process requests"
         ),
-    }
+    )
 
 
 @app.post(
@@ -171,7 +283,7 @@ async def health():
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
-async def answer_endpoint(request: QARequest):
+async def answer_endpoint(request: QARequest) -> QAResponse:
     """
     Answer a question based on provided context.
 
@@ -199,12 +311,20 @@ async def answer_endpoint(request: QARequest):
         )
 
         # Get answer
-        logger.debug("Calling answer_question function")
-        answer = answer_question(
-            question=request.question,
-            context=request.context,
-            config=config,
-        )
+        if _batcher is not None:
+            logger.debug("Submitting question to batched answerer")
+            answer = await _batcher.answer(
+                question=request.question,
+                context=request.context,
+                config=config,
+            )
+        else:
+            logger.debug("Calling answer_question_async function")
+            answer = await answer_question_async(
+                question=request.question,
+                context=request.context,
+                config=config,
+            )
 
         logger.info(
             "Answer generated successfully",
@@ -222,7 +342,8 @@ async def answer_endpoint(request: QARequest):
         is_rate_limit = "rate limit" in str(e).lower()
         status_code = 429 if is_rate_limit else 400
         logger.warning(
-            f"Security error: {str(e)}",
+            "Security error: %s",
+            e,
             extra={
                 "extra_fields": {
                     "error_type": "rate_limit" if is_rate_limit else "security",
@@ -234,14 +355,16 @@ async def answer_endpoint(request: QARequest):
     except ValueError as e:
         # Invalid configuration
         logger.warning(
-            f"Validation error: {str(e)}",
+            "Validation error: %s",
+            e,
             extra={"extra_fields": {"error_type": "validation", "status_code": 422}},
         )
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         # Other errors
         logger.error(
-            f"Internal error: {str(e)}",
+            "Internal error: %s",
+            e,
             extra={"extra_fields": {"error_type": "internal", "status_code": 500}},
             exc_info=True,
         )
@@ -251,6 +374,88 @@ async def answer_endpoint(request: QARequest):
         )
 
 
+def _sse_event(data: dict) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+@app.post(
+    "/answer/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse, "description": "Bad request"},
+        422: {"model": ErrorResponse, "description": "Validation error"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def answer_stream_endpoint(request: QARequest):
+    """
+    Stream the answer to a question as Server-Sent Events.
+
+    Each event carries a ``delta`` with the next piece of sanitized output;
+    text a sanitization pattern could still match is held back until more
+    output arrives. The final event carries the full sanitized ``answer``,
+    which equals the joined deltas, followed by ``[DONE]``.
+    """
+    logger.info(
+        "Streaming answer request received",
+        extra={
+            "extra_fields": {
+                "question_length": len(request.question),
+                "context_length": len(request.context),
+                "model": request.model,
+                "temperature": request.temperature,
+            }
+        },
+    )
+
+    config = QAConfig(
+        model=request.model,
+        temperature=request.temperature,
+        max_context_chars=request.max_context_chars,
+    )
+    chunks = astream_answer(request.question, request.context, config)
+
+    # Pull the first chunk before responding so validation and rate limit
+    # errors still map to proper HTTP status codes
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = ""
+    except SecurityError as e:
+        is_rate_limit = "rate limit" in str(e).lower()
+        raise HTTPException(status_code=429 if is_rate_limit else 400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error("Internal error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+    async def events():
+        parts = [first]
+        sanitizer = OutputStreamSanitizer()
+        delta = sanitizer.feed(first)
+        try:
+            if delta:
+                yield _sse_event({"delta": delta})
+            async for chunk in chunks:
+                parts.append(chunk)
+                delta = sanitizer.feed(chunk)
+                if delta:
+                    yield _sse_event({"delta": delta})
+        except Exception as e:
+            logger.error("Streaming failed: %s", e, exc_info=True)
+            yield _sse_event({"error": f"Internal error: {str(e)}"})
+        else:
+            delta = sanitizer.close()
+            if delta:
+                yield _sse_event({"delta": delta})
+            yield _sse_event({"answer": sanitize_output("".join(parts))})
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 # Example usage endpoint
 @app.get("/example")
 async def example():
@@ -283,11 +488,19 @@ if __name__ == "__main__":
             "Warning: No API key configured. Set OPENAI_API_KEY or AZURE_OPENAI_API_KEY."
         )
 
-    # Run server
+    # "auto" picks uvloop/httptools when installed. Auto-reload is opt-in for
+    # development. Rate limits, the concurrency controller and caches are
+    # per process, so each extra WEB_CONCURRENCY worker multiplies them; run
+    # one worker unless that is explicitly wanted.
     port = int(os.getenv("PORT", 8000))
+    reload = os.getenv("QA_RELOAD", "false").lower() == "true"
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
     uvicorn.run(
         "api_server:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
+        reload=reload,
+        workers=None if reload else workers,
+        loop="auto",
+        http="auto",
     )
@@ -3,10 +3,6 @@
 
 import os
 import sys
-from pathlib import Path
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 from qa_chain import (
     DebugContext,
@@ -9,10 +9,6 @@ This shows the basic usage of answer_question() with just two inputs:
 
 import os
 import sys
-from pathlib import Path
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 from qa_chain import answer_question
 
@@ -1,11 +1,53 @@
-from .chain import answer_question
-from .config import QAConfig
-from .debug_utils import DebugContext, debug_mode, dump_debug_info
-from .logging_config import get_logger, setup_logging
-from .security import SecurityError
+"""Context-grounded question answering with LangChain.
+
+Public names are imported lazily on first access, so ``import qa_chain``
+(for example to build a ``QAConfig``) does not pull in LangChain.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .chain import (
+        aclose_clients,
+        answer_question,
+        answer_question_async,
+        answer_questions,
+        astream_answer,
+        awarm_up,
+        configure_qa_logging,
+    )
+    from .config import QAConfig
+    from .debug_utils import DebugContext, debug_mode, dump_debug_info
+    from .logging_config import get_logger, setup_logging
+    from .security import SecurityError
+
+# Public name -> (submodule, attribute)
+_LAZY: Dict[str, Tuple[str, str]] = {
+    "aclose_clients": (".chain", "aclose_clients"),
+    "answer_question": (".chain", "answer_question"),
+    "answer_question_async": (".chain", "answer_question_async"),
+    "answer_questions": (".chain", "answer_questions"),
+    "astream_answer": (".chain", "astream_answer"),
+    "awarm_up": (".chain", "awarm_up"),
+    "configure_qa_logging": (".chain", "configure_qa_logging"),
+    "QAConfig": (".config", "QAConfig"),
+    "SecurityError": (".security", "SecurityError"),
+    "setup_logging": (".logging_config", "setup_logging"),
+    "get_logger": (".logging_config", "get_logger"),
+    "DebugContext": (".debug_utils", "DebugContext"),
+    "debug_mode": (".debug_utils", "debug_mode"),
+    "dump_debug_info": (".debug_utils", "dump_debug_info"),
+}
 
 __all__ = [
+    "aclose_clients",
     "answer_question",
+    "answer_question_async",
+    "answer_questions",
+    "astream_answer",
+    "awarm_up",
+    "configure_qa_logging",
     "QAConfig",
     "SecurityError",
     "setup_logging",
@@ -14,3 +56,17 @@ __all__ = [
     "debug_mode",
     "dump_debug_info",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
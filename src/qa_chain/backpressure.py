@@ -0,0 +1,258 @@
+"""Adaptive (AIMD) concurrency control driven by provider rate-limit signals."""
+
+import asyncio
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Optional
+from weakref import WeakKeyDictionary
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .logging_config import get_logger
+from .retry import RETRIABLE_STATUS_CODES
+
+logger = get_logger(__name__)
+
+# Durations in OpenAI's x-ratelimit-reset-* headers, e.g. "1s", "6m0s", "20ms"
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a retry-after or reset header value into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    Every successful LLM response raises the limit by ``increase``; a 429 or
+    5xx response multiplies it by ``decrease``. ``retry-after`` headers, and an
+    exhausted ``x-ratelimit-remaining-requests`` budget, pause new requests
+    until the provider says capacity is available again.
+
+    Signals are thread-safe and can come from any caller. Only async callers
+    are gated, via `slot`, and a controller's waiters belong to a single event
+    loop; `get_aimd_controller` hands out one controller per loop.
+    """
+
+    def __init__(
+        self,
+        initial_concurrency: float = 16,
+        min_concurrency: float = 1,
+        max_concurrency: float = 64,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+    ):
+        """Initialize the controller.
+
+        Args:
+            initial_concurrency: Starting number of concurrent requests
+            min_concurrency: Lower bound for the limit
+            max_concurrency: Upper bound for the limit
+            increase: Amount added to the limit after each success
+            decrease: Factor applied to the limit after each throttle
+        """
+        self.concurrency = float(initial_concurrency)
+        self.min_concurrency = float(min_concurrency)
+        self.max_concurrency = float(max_concurrency)
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.lock = Lock()
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(1, int(self.concurrency))
+
+    def on_success(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Record a successful response and its rate-limit headers.
+
+        Args:
+            headers: Response headers, if available
+        """
+        headers = headers or {}
+        with self.lock:
+            if headers.get("x-ratelimit-remaining-requests") == "0":
+                reset = _parse_duration(headers.get("x-ratelimit-reset-requests"))
+                self._pause(reset)
+            else:
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + self.increase
+                )
+            self._pause(_parse_duration(headers.get("retry-after")))
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Record a throttled (429/5xx) response.
+
+        Args:
+            retry_after: Seconds the provider asked us to wait, if any
+        """
+        with self.lock:
+            self.concurrency = max(
+                self.min_concurrency, self.concurrency * self.decrease
+            )
+            self._pause(retry_after)
+        logger.warning(
+            "Provider throttled request; concurrency limit now %d", self.limit
+        )
+
+    def on_error(self, error: BaseException) -> None:
+        """Record a failed request, backing off if it was a throttle.
+
+        Args:
+            error: The exception raised by the LLM call
+        """
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) not in RETRIABLE_STATUS_CODES:
+            return
+        headers = getattr(response, "headers", None) or {}
+        self.on_throttle(_parse_duration(headers.get("retry-after")))
+
+    def _pause(self, seconds: Optional[float]) -> None:
+        if seconds:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free request slot under the current limit."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Woken by a release just as we were cancelled: pass the
+                # wake-up on, or the freed slot sits idle until the next one
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+
+class RateLimitHeaderHandler(BaseCallbackHandler):
+    """Feed LLM responses and errors into an `AIMDController`."""
+
+    run_inline = True
+
+    def __init__(self, controller: Optional[AIMDController] = None):
+        """Initialize the handler.
+
+        Args:
+            controller: Controller to update; defaults to the global one
+        """
+        self.controller = controller
+
+    def _controller(self) -> AIMDController:
+        return self.controller or get_aimd_controller()
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        headers: Dict[str, str] = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                metadata = getattr(message, "response_metadata", None) or {}
+                headers = metadata.get("headers") or headers
+        self._controller().on_success(headers)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        self._controller().on_error(error)
+
+
+# Settings for new controllers (can be configured per deployment)
+_aimd_settings: Dict[str, float] = {}
+
+# Slot waiters are futures bound to one event loop, so each running loop gets
+# its own controller; signals from outside any loop go to the global one
+_global_aimd_controller = AIMDController()
+_loop_controllers: "WeakKeyDictionary[asyncio.AbstractEventLoop, AIMDController]" = (
+    WeakKeyDictionary()
+)
+_loop_controllers_lock = Lock()
+
+
+def get_aimd_controller() -> AIMDController:
+    """Return the concurrency controller for the running event loop.
+
+    Outside an event loop (e.g. signals from synchronous calls), the global
+    controller is returned.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _global_aimd_controller
+    controller = _loop_controllers.get(loop)
+    if controller is None:
+        with _loop_controllers_lock:
+            controller = _loop_controllers.get(loop)
+            if controller is None:
+                controller = AIMDController(**_aimd_settings)
+                _loop_controllers[loop] = controller
+    return controller
+
+
+def configure_aimd_controller(
+    initial_concurrency: float = 16,
+    min_concurrency: float = 1,
+    max_concurrency: float = 64,
+) -> None:
+    """Configure the concurrency controllers.
+
+    Controllers already handed out to running event loops are replaced.
+
+    Args:
+        initial_concurrency: Starting number of concurrent requests
+        min_concurrency: Lower bound for the limit
+        max_concurrency: Upper bound for the limit
+    """
+    global _global_aimd_controller
+    _aimd_settings.update(
+        initial_concurrency=initial_concurrency,
+        min_concurrency=min_concurrency,
+        max_concurrency=max_concurrency,
+    )
+    _global_aimd_controller = AIMDController(**_aimd_settings)
+    with _loop_controllers_lock:
+        _loop_controllers.clear()
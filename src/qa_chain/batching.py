@@ -0,0 +1,180 @@
+"""Micro-batching of concurrent async requests into shared LLM calls."""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .backpressure import get_aimd_controller
+from .chain import _ainvoke_chain_with_retry, _answer_async
+from .config import DEFAULT_CONFIG, QAConfig
+from .logging_config import get_logger
+from .retry import is_retriable_error
+
+logger = get_logger(__name__)
+
+# (chain, question, context, config, future) for one waiting caller
+_PendingItem = Tuple[Any, str, str, QAConfig, "asyncio.Future[str]"]
+
+# Contexts are grouped into buckets of this many characters so a batch holds
+# prompts of similar length.
+_LENGTH_BUCKET_CHARS = 1000
+
+
+class BatchedAnswerer:
+    """Coalesce concurrent questions into `chain.abatch` calls.
+
+    Requests arriving within ``max_wait_ms`` of each other (up to
+    ``max_batch_size``) that target the same pipeline are sent to the LLM as
+    one batch. Validation, caching, rate limiting and output sanitization are
+    applied per request exactly as in `answer_question_async`.
+    """
+
+    def __init__(self, max_batch_size: int = 16, max_wait_ms: float = 20.0):
+        """Initialize the batcher.
+
+        Args:
+            max_batch_size: Maximum number of requests collected into one batch
+            max_wait_ms: How long to wait for more requests after the first one
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional["asyncio.Queue[_PendingItem]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+        self._batches: Set["asyncio.Task[None]"] = set()
+
+    def start(self) -> None:
+        """Start the background worker on the running event loop."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and wait for in-flight batches to finish.
+
+        Requests still waiting to be batched fail with `RuntimeError`.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _fail_pending([self._queue.get_nowait()])
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+    async def answer(
+        self, question: str, context: str, config: Optional[QAConfig] = None
+    ) -> str:
+        """Answer a question, sharing the LLM call with concurrent requests.
+
+        Args:
+            question: The user's question
+            context: Context to answer from
+            config: Optional QAConfig; uses defaults if not provided
+
+        Returns:
+            The model's answer as a plain string
+
+        Raises:
+            SecurityError: If inputs or config violate security constraints
+        """
+        self.start()
+        return await _answer_async(
+            question, context, config or DEFAULT_CONFIG, self._submit
+        )
+
+    async def _submit(
+        self, chain: Any, question: str, context: str, config: QAConfig
+    ) -> str:
+        assert self._queue is not None
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        await self._queue.put((chain, question, context, config, future))
+        return await future
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            try:
+                while len(items) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    items.append(item)
+            except asyncio.CancelledError:
+                _fail_pending(items)
+                raise
+
+            for group in _group_items(items):
+                task = asyncio.create_task(self._run_batch(group))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, group: List[_PendingItem]) -> None:
+        chain = group[0][0]
+        logger.debug("Invoking batch of %s requests", len(group))
+        controller = get_aimd_controller()
+        try:
+            # The batch takes one adaptive concurrency slot, and its own
+            # fan-out is capped at the controller's current limit
+            async with controller.slot():
+                results = await chain.abatch(
+                    [{"question": q, "context": c} for _, q, c, _, _ in group],
+                    config={"max_concurrency": controller.limit},
+                    return_exceptions=True,
+                )
+        except Exception as error:
+            results = [error] * len(group)
+
+        retries = []
+        for item, result in zip(group, results):
+            _, question, context, config, future = item
+            if future.done():
+                continue
+            if not isinstance(result, Exception):
+                future.set_result(result)
+            elif config.enable_retry and is_retriable_error(result):
+                retries.append(self._retry_single(item))
+            else:
+                future.set_exception(result)
+
+        if retries:
+            await asyncio.gather(*retries)
+
+    async def _retry_single(self, item: _PendingItem) -> None:
+        chain, question, context, config, future = item
+        try:
+            result = await _ainvoke_chain_with_retry(chain, question, context, config)
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+
+def _fail_pending(items: List[_PendingItem]) -> None:
+    """Fail the futures of requests that were never sent to the LLM."""
+    for *_, future in items:
+        if not future.done():
+            future.set_exception(
+                RuntimeError("BatchedAnswerer stopped before the request was sent")
+            )
+
+
+def _group_items(items: List[_PendingItem]) -> List[List[_PendingItem]]:
+    """Group items by target pipeline and context length bucket."""
+    groups: Dict[Tuple[int, int], List[_PendingItem]] = {}
+    for item in items:
+        key = (id(item[0]), len(item[2]) // _LENGTH_BUCKET_CHARS)
+        groups.setdefault(key, []).append(item)
+    return list(groups.values())
@@ -0,0 +1,294 @@
+"""Simple in-process response cache for answered questions."""
+
+import functools
+import hashlib
+import math
+import operator
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Embedding model used by the semantic cache when no embedder is supplied
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def make_cache_key(model: str, temperature: float, question: str, context: str) -> str:
+    """Build a compact cache key for a (model, temperature, question, context) tuple.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        question: Normalized question
+        context: Normalized (and clipped) context
+
+    Returns:
+        Hex digest identifying the request
+    """
+    raw = f"{model}|{temperature}|{question}|{context}".encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def make_context_key(model: str, context: str) -> str:
+    """Build a cache key identifying a (model, context) pair.
+
+    Args:
+        model: Model name
+        context: Normalized (and clipped) context
+
+    Returns:
+        Hex digest identifying the context
+    """
+    return hashlib.blake2b(f"{model}|{context}".encode(), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry time-to-live."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600):
+        """Initialize response cache.
+
+        Args:
+            max_size: Maximum number of entries kept before evicting the LRU one
+            ttl_seconds: Default time-to-live for entries in seconds
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl_seconds: Optional TTL overriding the cache default
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _unit_vector(vector: Sequence[float]) -> Tuple[float, ...]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return tuple(x / norm for x in vector)
+
+
+def _default_embedder() -> Callable[[str], Sequence[float]]:
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "The semantic cache requires sentence-transformers "
+            "(pip install sentence-transformers)"
+        ) from e
+
+    model = SentenceTransformer(DEFAULT_EMBEDDING_MODEL)
+    return lambda text: model.encode(text).tolist()
+
+
+class SemanticCache:
+    """Cache answers for paraphrased questions about the same context.
+
+    Entries are grouped by context key, so a hit always means the exact same
+    context; within a context, a question matches a cached one when the cosine
+    similarity of their embeddings reaches the threshold. Contexts are evicted
+    least recently used first once more than ``max_contexts`` are cached.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries_per_context: int = 64,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        max_contexts: int = 1024,
+    ):
+        """Initialize semantic cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Default time-to-live for entries in seconds
+            max_entries_per_context: Questions kept per context before the
+                oldest is dropped
+            embed: Function mapping text to an embedding vector; defaults to a
+                local sentence-transformers MiniLM model
+            max_contexts: Contexts kept before the least recently used one is
+                dropped
+
+        Raises:
+            ImportError: If no embedder is given and sentence-transformers is
+                not installed
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_context = max_entries_per_context
+        self.max_contexts = max_contexts
+        self.embed = embed or _default_embedder()
+        # A miss embeds the question in `get` and again in `set` once the
+        # answer arrives; remember recent vectors so that is done only once
+        self._question_vector = functools.lru_cache(maxsize=256)(self._unit_embedding)
+        self.entries: "OrderedDict[str, List[Tuple[float, Tuple[float, ...], str]]]" = (
+            OrderedDict()
+        )
+        self.lock = Lock()
+
+    def _unit_embedding(self, question: str) -> Tuple[float, ...]:
+        return _unit_vector(self.embed(question))
+
+    def get(
+        self, question: str, context_key: str, threshold: Optional[float] = None
+    ) -> Optional[str]:
+        """Return the answer cached for the most similar question, if any.
+
+        Args:
+            question: Normalized question
+            context_key: Key of the context the question is about
+            threshold: Optional similarity threshold overriding the default
+
+        Returns:
+            The cached answer, or None
+        """
+        with self.lock:
+            if context_key not in self.entries:
+                return None
+
+        query = self._question_vector(question)
+        min_score = self.threshold if threshold is None else threshold
+        now = time.monotonic()
+
+        with self.lock:
+            entries = self.entries.get(context_key)
+            if entries is None:
+                return None
+            entries[:] = [entry for entry in entries if entry[0] > now]
+            if not entries:
+                del self.entries[context_key]
+                return None
+            self.entries.move_to_end(context_key)
+            best_score, best_value = min_score, None
+            for _, vector, value in entries:
+                score = sum(map(operator.mul, query, vector))
+                if score >= best_score:
+                    best_score, best_value = score, value
+            return best_value
+
+    def set(
+        self,
+        question: str,
+        context_key: str,
+        value: str,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """Store an answer for a question about a context.
+
+        Args:
+            question: Normalized question
+            context_key: Key of the context the question is about
+            value: Answer to cache
+            ttl_seconds: Optional TTL overriding the cache default
+        """
+        vector = self._question_vector(question)
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self.lock:
+            entries = self.entries.setdefault(context_key, [])
+            entries.append((time.monotonic() + ttl, vector, value))
+            del entries[: -self.max_entries_per_context]
+            self.entries.move_to_end(context_key)
+            while len(self.entries) > self.max_contexts:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self.lock:
+            self.entries.clear()
+
+
+# Global response cache instance (can be configured per deployment)
+_global_response_cache = ResponseCache(max_size=1024, ttl_seconds=3600)
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the global response cache."""
+    return _global_response_cache
+
+
+def configure_response_cache(max_size: int, ttl_seconds: float) -> None:
+    """Configure the global response cache.
+
+    Args:
+        max_size: Maximum number of cached answers
+        ttl_seconds: Default time-to-live in seconds
+    """
+    global _global_response_cache
+    _global_response_cache = ResponseCache(max_size, ttl_seconds)
+
+
+# Global semantic cache, created on first use since it loads an embedding model
+_global_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the global semantic cache, creating it if needed.
+
+    Raises:
+        ImportError: If sentence-transformers is not installed
+    """
+    global _global_semantic_cache
+    if _global_semantic_cache is None:
+        # Concurrent first requests must not each load the embedding model
+        with _semantic_cache_lock:
+            if _global_semantic_cache is None:
+                _global_semantic_cache = SemanticCache()
+    return _global_semantic_cache
+
+
+def configure_semantic_cache(
+    threshold: float = 0.95,
+    ttl_seconds: float = 3600,
+    embed: Optional[Callable[[str], Sequence[float]]] = None,
+) -> None:
+    """Configure the global semantic cache.
+
+    Args:
+        threshold: Minimum cosine similarity for a cache hit
+        ttl_seconds: Default time-to-live in seconds
+        embed: Optional embedding function replacing the default model
+    """
+    global _global_semantic_cache
+    _global_semantic_cache = SemanticCache(threshold, ttl_seconds, embed=embed)
@@ -1,74 +1,373 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import logging
 import re
 import time
 import unicodedata
-from typing import Any, Dict
-
+from collections import Counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import httpx
+import tiktoken
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
 
-from .config import QAConfig
-from .logging_config import LogContext, get_logger, setup_logging
-from .prompts import build_prompt
+from .backpressure import RateLimitHeaderHandler, get_aimd_controller
+from .cache import (
+    get_response_cache,
+    get_semantic_cache,
+    make_cache_key,
+    make_context_key,
+)
+from .config import DEFAULT_CONFIG, QAConfig
+from .logging_config import (
+    LogContext,
+    get_logger,
+    is_logging_configured,
+    setup_logging,
+)
+from .prompts import (
+    CONTEXT_TEMPLATE,
+    NO_ANSWER,
+    QUESTION_TEMPLATE,
+    SYSTEM_PROMPT,
+    build_prompt,
+)
 from .rate_limiter import check_rate_limit
-from .retry import RetryError, RetryPolicy
+from .retry import BackoffStrategy, RetryError, RetryPolicy, is_retriable_error
 from .security import sanitize_output, validate_config, validate_input
 
 # Initialize logger
 logger = get_logger(__name__)
 
+# Answers sampled above this temperature are intentionally stochastic and are
+# never served from the response cache.
+_CACHE_MAX_TEMPERATURE = 0.3
+
+# Prompt templates are immutable, so one instance serves every pipeline
+_PROMPT = build_prompt()
+
+# Contexts shorter than this cannot contain an answer; such requests are
+# answered directly without calling the LLM.
+_MIN_CONTEXT_CHARS = 10
+
+# Tokenizer for models tiktoken does not know
+_FALLBACK_ENCODING = "o200k_base"
+
+# Number of requests answered without the LLM, by reason
+_short_circuits: Counter[str] = Counter()
+
+# (model, temperature, max_context_chars) tuples that passed validate_config
+_validated_configs: Set[Tuple[str, float, int]] = set()
+_MAX_VALIDATED_CONFIGS = 128
+
+# Process-wide HTTP connection pools shared by every ChatOpenAI instance, so
+# requests reuse keep-alive connections instead of paying a fresh TCP/TLS
+# handshake each time. Idle connections are dropped after a minute, before
+# the server or a proxy is likely to have closed them under us.
+_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0
+)
+_HTTP_TIMEOUT = httpx.Timeout(timeout=600.0, connect=5.0)
+_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+_AHTTP_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+atexit.register(_HTTP_CLIENT.close)
+
+# Reports response headers and throttling errors to the AIMD controller
+_RATE_LIMIT_HANDLER = RateLimitHeaderHandler()
+
+# NFKC normalizer: ICU's C++ implementation when PyICU is installed (faster on
+# large non-ASCII contexts), otherwise the standard library
+_nfkc: Callable[[str], str]
+try:
+    from icu import Normalizer2
+
+    _nfkc = Normalizer2.getNFKCInstance().normalize
+except ImportError:
+    _nfkc = functools.partial(unicodedata.normalize, "NFKC")
+
+# Smart quotes, dashes, ellipses and non-breaking spaces mapped to their ASCII
+# equivalents, and zero-width spaces dropped, in a single pass
+_TRANS_TABLE = str.maketrans(
+    {
+        0x2018: "'",
+        0x2019: "'",
+        0x201C: '"',
+        0x201D: '"',
+        0x2013: "-",
+        0x2014: "-",
+        0x2026: "...",
+        0x00A0: " ",
+        0x200B: None,
+    }
+)
+# Whitespace that collapsing would rewrite: runs, or any single non-space char
+_UNCLEAN_WS_RE = re.compile(r"\s{2,}|[^\S ]")
+
 
 def _normalize_text(s: str) -> str:
-    # Normalize unicode and collapse whitespace
-    logger.debug(f"Normalizing text of length {len(s or '')}")
-    s = unicodedata.normalize("NFKC", s or "")
-    # Replace smart quotes with ascii equivalents
-    s = (
-        s.replace("\u2018", "'")
-        .replace("\u2019", "'")
-        .replace("\u201c", '"')
-        .replace("\u201d", '"')
-    )
-    s = s.replace("\u2013", "-").replace("\u2014", "-")
-    # Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
-    logger.debug(f"Normalized text to length {len(s)}")
+    s = s or ""
+    if s.isascii():
+        # NFKC and the smart quote table are no-ops on ASCII text
+        s = " ".join(s.split()) if _UNCLEAN_WS_RE.search(s) else s.strip()
+    else:
+        # Normalize unicode (the quick check avoids a copy for text that is
+        # already NFKC), replace smart quotes/dashes and collapse whitespace
+        if not unicodedata.is_normalized("NFKC", s):
+            s = _nfkc(s)
+        s = " ".join(s.translate(_TRANS_TABLE).split())
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Normalized text to length %d", len(s))
     return s
 
 
+def _sentence_cut(text: str, limit: int) -> int:
+    """Return where to cut text so it ends at a sentence within `limit` chars."""
+    # Cut after the last sentence terminator within the last 200 chars, scanning
+    # the original string in place rather than slicing copies of it
+    lo = max(0, limit - 200)
+    idx = max(
+        text.rfind(". ", lo, limit),
+        text.rfind("! ", lo, limit),
+        text.rfind("? ", lo, limit),
+    )
+    return idx + 1 if idx != -1 else limit
+
+
 def _clip_context(context: str, max_chars: int) -> str:
     original_length = len(context)
     if original_length <= max_chars:
-        logger.debug(f"Context length {original_length} within limit {max_chars}")
+        logger.debug("Context length %d within limit %d", original_length, max_chars)
+        return context
+
+    logger.info("Clipping context from %d to %d chars", original_length, max_chars)
+    cut = _sentence_cut(context, max_chars)
+
+    logger.debug("Context clipped to %d chars at sentence boundary", cut)
+    return context[:cut]
+
+
+@functools.lru_cache(maxsize=8)
+def _encoding_for(model: str) -> tiktoken.Encoding:
+    """Return the (cached) tokenizer used by a model."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(_FALLBACK_ENCODING)
+
+
+def _clip_context_tokens(context: str, max_tokens: int, model: str) -> str:
+    tokens = _encoding_for(model).encode_ordinary(context)
+    if len(tokens) <= max_tokens:
+        logger.debug("Context tokens %d within limit %d", len(tokens), max_tokens)
         return context
 
-    logger.info(f"Clipping context from {original_length} to {max_chars} chars")
-    # Try to cut on a sentence boundary near the limit
-    clipped = context[:max_chars]
-    # Backtrack to the last sentence terminator within the last 200 chars
-    tail = clipped[-200:]
-    idx = max(tail.rfind(". "), tail.rfind("! "), tail.rfind("? "))
-    if idx != -1:
-        clipped = clipped[: len(clipped) - (len(tail) - idx - 1)]
+    logger.info("Clipping context from %d to %d tokens", len(tokens), max_tokens)
+    # A cut inside a multi-byte character decodes to a replacement character
+    clipped = _encoding_for(model).decode(tokens[:max_tokens]).rstrip("\ufffd")
+    return clipped[: _sentence_cut(clipped, len(clipped))]
 
-    logger.debug(f"Context clipped to {len(clipped)} chars at sentence boundary")
-    return clipped
+
+@functools.lru_cache(maxsize=8)
+def _prompt_overhead_tokens(model: str) -> int:
+    """Tokens in the fixed parts of the prompt, encoded once per model."""
+    encode = _encoding_for(model).encode_ordinary
+    templates = (
+        SYSTEM_PROMPT,
+        CONTEXT_TEMPLATE.format(context=""),
+        QUESTION_TEMPLATE.format(question=""),
+    )
+    return sum(len(encode(text)) for text in templates)
 
 
-def _preprocess(inputs: Dict[str, str], config: QAConfig) -> Dict[str, str]:
+def count_prompt_tokens(question: str, context: str, model: str) -> int:
+    """Estimate the prompt tokens a request sends to the model.
+
+    The system prompt and template text are tokenized once per model; only the
+    question and context are encoded per call. Message framing tokens added
+    by the chat format are not counted.
+
+    Args:
+        question: Normalized question
+        context: Normalized (and clipped) context
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Approximate number of prompt tokens
+    """
+    encode = _encoding_for(model).encode_ordinary
+    return _prompt_overhead_tokens(model) + len(encode(question)) + len(encode(context))
+
+
+def _preprocess(
+    inputs: Dict[str, str],
+    max_context_chars: int,
+    max_context_tokens: Optional[int] = None,
+    model: str = "",
+) -> Dict[str, str]:
     q = _normalize_text(inputs.get("question", ""))
     c = _normalize_text(inputs.get("context", ""))
-    c = _clip_context(c, config.max_context_chars)
+    c = _clip_context(c, max_context_chars)
+    if max_context_tokens is not None:
+        c = _clip_context_tokens(c, max_context_tokens, model)
     return {"question": q, "context": c}
 
 
+def _preprocess_request(question: str, context: str, cfg: QAConfig) -> Dict[str, str]:
+    """Normalize and clip a request's inputs as described by the config."""
+    inputs = _preprocess(
+        {"question": question, "context": context},
+        cfg.max_context_chars,
+        cfg.max_context_tokens,
+        cfg.model,
+    )
+    # The tokenizer is only loaded when token clipping is enabled
+    if cfg.max_context_tokens is not None and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Prompt is about %d tokens",
+            count_prompt_tokens(inputs["question"], inputs["context"], cfg.model),
+        )
+    return inputs
+
+
+@functools.lru_cache(maxsize=16)
+def _get_llm(model: str, temperature: float) -> ChatOpenAI:
+    """Return a cached ChatOpenAI client bound to the shared connection pools."""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_AHTTP_CLIENT,
+        include_response_headers=True,
+        callbacks=[_RATE_LIMIT_HANDLER],
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _chain_for(model: str, temperature: float) -> Any:
+    """Return the composed pipeline for a (model, temperature) setting."""
+    return _PROMPT | _get_llm(model, temperature) | StrOutputParser()
+
+
 def build_chain(config: QAConfig) -> Any:
-    preprocess = RunnableLambda(lambda d: _preprocess(d, config))
-    prompt = build_prompt()
-    llm = ChatOpenAI(model=config.model, temperature=config.temperature)
-    return preprocess | prompt | llm | StrOutputParser()
+    """Return the prompt -> LLM -> parser pipeline for a config.
+
+    The pipeline expects inputs already normalized and clipped by
+    `_preprocess_request`, which every entry point runs first (the response
+    cache and short-circuit checks need the preprocessed text anyway).
+    """
+    return _chain_for(config.model, config.temperature)
+
+
+async def awarm_up(config: QAConfig | None = None) -> None:
+    """Open a pooled connection to the API before the first real request.
+
+    Builds the cached client and pipeline for the config and lists models
+    through the shared async connection pool, so the first user request does
+    not pay for client initialization, nor for DNS and TLS if it arrives
+    before the warmed connection idles out of the pool (``keepalive_expiry``,
+    60 seconds). Failures are logged and otherwise ignored.
+
+    Args:
+        config: Optional QAConfig selecting the model to warm up
+    """
+    cfg = config or DEFAULT_CONFIG
+    try:
+        build_chain(cfg)
+        await _get_llm(cfg.model, cfg.temperature).root_async_client.models.list()
+        logger.info("LLM client warmed up for %s", cfg.model)
+    except Exception:
+        logger.warning("LLM client warm-up failed", exc_info=True)
+
+
+async def aclose_clients() -> None:
+    """Close the pooled async connections; the counterpart of `awarm_up`.
+
+    Call this when an event loop that served requests shuts down (the sync
+    pool is closed at interpreter exit). Later requests open a fresh pool.
+    """
+    global _AHTTP_CLIENT
+    client = _AHTTP_CLIENT
+    _AHTTP_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+    # Cached clients and pipelines are bound to the old pool
+    _get_llm.cache_clear()
+    _chain_for.cache_clear()
+    await client.aclose()
+
+
+@functools.lru_cache(maxsize=32)
+def _policy_for(
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float,
+    exponential_base: float,
+    jitter: bool,
+    strategy: BackoffStrategy = "exponential",
+) -> RetryPolicy:
+    """Return a shared RetryPolicy for the given settings."""
+    return RetryPolicy(
+        max_attempts=max_attempts,
+        base_delay=base_delay,
+        max_delay=max_delay,
+        exponential_base=exponential_base,
+        jitter=jitter,
+        strategy=strategy,
+    )
+
+
+def _retry_policy(config: QAConfig) -> RetryPolicy:
+    """Return the retry policy described by the config."""
+    return _policy_for(
+        config.max_retry_attempts,
+        config.retry_base_delay,
+        config.retry_max_delay,
+        config.retry_exponential_base,
+        config.retry_jitter,
+        config.retry_strategy,
+    )
+
+
+def _invoke_chain(chain: Any, question: str, context: str) -> str:
+    result: str = chain.invoke({"question": question, "context": context})
+    return result
+
+
+@functools.lru_cache(maxsize=32)
+def _retrying_invoker(policy: RetryPolicy) -> Callable[[Any, str, str], str]:
+    """Return `_invoke_chain` wrapped in the policy's retry decorator."""
+
+    @policy.as_decorator()
+    def invoke_with_retry(chain: Any, question: str, context: str) -> str:
+        return _invoke_chain(chain, question, context)
+
+    retrying: Callable[[Any, str, str], str] = invoke_with_retry
+    return retrying
+
+
+def _log_retries_exhausted(error: RetryError, config: QAConfig) -> None:
+    logger.error(
+        "All retry attempts exhausted",
+        extra={
+            "extra_fields": {
+                "max_attempts": config.max_retry_attempts,
+                "last_error": str(error.last_error) if error.last_error else None,
+            }
+        },
+    )
 
 
 def _invoke_chain_with_retry(
@@ -91,41 +390,266 @@ def _invoke_chain_with_retry(
     """
     if not config.enable_retry:
         # No retry - just invoke directly
-        result: str = chain.invoke({"question": question, "context": context})
-        return result
+        return _invoke_chain(chain, question, context)
+
+    invoke_with_retry = _retrying_invoker(_retry_policy(config))
+
+    try:
+        retry_result: str = invoke_with_retry(chain, question, context)
+        return retry_result
+    except RetryError as e:
+        _log_retries_exhausted(e, config)
+        # Re-raise the last error for better error messages
+        if e.last_error:
+            raise e.last_error
+        raise
 
-    # Create retry policy from config
-    retry_policy = RetryPolicy(
-        max_attempts=config.max_retry_attempts,
-        base_delay=config.retry_base_delay,
-        max_delay=config.retry_max_delay,
-        exponential_base=config.retry_exponential_base,
-        jitter=config.retry_jitter,
-    )
 
-    # Define the function to retry
-    @retry_policy.as_decorator()
-    def invoke_with_retry() -> str:
-        result: str = chain.invoke({"question": question, "context": context})
+async def _ainvoke_chain(chain: Any, inputs: Dict[str, str]) -> str:
+    """Await the chain within the adaptive concurrency limit."""
+    async with get_aimd_controller().slot():
+        result: str = await chain.ainvoke(inputs)
         return result
 
+
+@functools.lru_cache(maxsize=32)
+def _aretrying_invoker(
+    policy: RetryPolicy,
+) -> Callable[[Any, Dict[str, str]], Awaitable[str]]:
+    """Return `_ainvoke_chain` wrapped in the policy's async retry decorator."""
+
+    @policy.as_async_decorator()
+    async def ainvoke_with_retry(chain: Any, inputs: Dict[str, str]) -> str:
+        return await _ainvoke_chain(chain, inputs)
+
+    retrying: Callable[[Any, Dict[str, str]], Awaitable[str]] = ainvoke_with_retry
+    return retrying
+
+
+async def _ainvoke_chain_with_retry(
+    chain: Any, question: str, context: str, config: QAConfig
+) -> str:
+    """Async counterpart of `_invoke_chain_with_retry` using `chain.ainvoke`.
+
+    Backoff delays are awaited so other requests keep running on the event
+    loop while this one waits to retry.
+    """
+    inputs = {"question": question, "context": context}
+    if not config.enable_retry:
+        return await _ainvoke_chain(chain, inputs)
+
+    ainvoke_with_retry = _aretrying_invoker(_retry_policy(config))
+
     try:
-        retry_result: str = invoke_with_retry()
-        return retry_result
+        return await ainvoke_with_retry(chain, inputs)
     except RetryError as e:
-        logger.error(
-            "All retry attempts exhausted",
+        _log_retries_exhausted(e, config)
+        # Re-raise the last error for better error messages
+        if e.last_error:
+            raise e.last_error
+        raise
+
+
+def configure_qa_logging(config: QAConfig) -> None:
+    """Install log handlers described by config.
+
+    Call this once at application startup; per-request calls only adjust the
+    root logger level instead of rebuilding handlers.
+
+    Args:
+        config: QAConfig providing log level, format and file
+    """
+    level = "DEBUG" if config.enable_debug_mode else config.log_level
+    setup_logging(level, config.log_format, config.log_file, config.log_buffer_bytes)
+
+
+def _setup_request_logging(config: QAConfig) -> None:
+    """Apply the config's log level, configuring logging on first use."""
+    if not is_logging_configured():
+        configure_qa_logging(config)
+    level = "DEBUG" if config.enable_debug_mode else config.log_level
+    logging.getLogger().setLevel(level)
+
+
+def _request_log_context(question: str, context: str, config: QAConfig) -> LogContext:
+    """Create log context with question info."""
+    return LogContext(
+        logger,
+        question_length=len(question),
+        context_length=len(context),
+        model=config.model,
+        temperature=config.temperature,
+    )
+
+
+def _validate_config_once(config: QAConfig) -> None:
+    """Run `validate_config` once per distinct (model, temperature, size) tuple."""
+    key = (config.model, config.temperature, config.max_context_chars)
+    if key in _validated_configs:
+        return
+    validate_config(config)
+    if len(_validated_configs) >= _MAX_VALIDATED_CONFIGS:
+        _validated_configs.clear()
+    _validated_configs.add(key)
+
+
+def _validate_request(question: str, context: str, config: QAConfig) -> None:
+    """Check the rate limit, then validate inputs and configuration."""
+    # Rate limit first so throttled callers are rejected before any other work
+    if config.enable_rate_limiting:
+        logger.debug("Checking rate limit for %s", config.rate_limit_identifier)
+        check_rate_limit(config.rate_limit_identifier)
+
+    logger.debug("Validating inputs")
+    validate_input(question, context)
+    _validate_config_once(config)
+
+
+def _short_circuit_answer(inputs: Dict[str, str]) -> Optional[str]:
+    """Return the fallback answer for requests that need no LLM call."""
+    if not inputs["question"]:
+        reason = "empty_question"
+    elif len(inputs["context"]) < _MIN_CONTEXT_CHARS:
+        reason = "short_context"
+    else:
+        return None
+
+    _short_circuits[reason] += 1
+    logger.info(
+        "Answering without LLM call",
+        extra={"extra_fields": {"short_circuit_reason": reason}},
+    )
+    return NO_ANSWER
+
+
+def get_short_circuit_stats() -> Dict[str, int]:
+    """Return how many requests were answered without an LLM call, by reason."""
+    return dict(_short_circuits)
+
+
+def _response_cache_key(inputs: Dict[str, str], config: QAConfig) -> Optional[str]:
+    """Return the response cache key for preprocessed inputs, if cacheable."""
+    if not config.enable_cache or config.temperature > _CACHE_MAX_TEMPERATURE:
+        return None
+    return make_cache_key(
+        config.model, config.temperature, inputs["question"], inputs["context"]
+    )
+
+
+def _semantic_context_key(inputs: Dict[str, str], config: QAConfig) -> Optional[str]:
+    """Return the semantic cache context key, if that tier applies."""
+    if not (
+        config.enable_cache and config.enable_semantic_cache and config.temperature == 0
+    ):
+        return None
+    return make_context_key(config.model, inputs["context"])
+
+
+def _cached_answer(
+    cache_key: Optional[str], inputs: Dict[str, str], config: QAConfig
+) -> Optional[str]:
+    if cache_key is None:
+        return None
+    cached = get_response_cache().get(cache_key)
+    if cached is not None:
+        logger.info("Returning cached answer")
+        return cached
+
+    context_key = _semantic_context_key(inputs, config)
+    if context_key is None:
+        return None
+    cached = get_semantic_cache().get(
+        inputs["question"], context_key, config.semantic_cache_threshold
+    )
+    if cached is not None:
+        logger.info("Returning semantically cached answer")
+    return cached
+
+
+async def _acached_answer(
+    cache_key: Optional[str], inputs: Dict[str, str], config: QAConfig
+) -> Optional[str]:
+    """`_cached_answer` for async callers, embedding off the event loop."""
+    if cache_key is not None and _semantic_context_key(inputs, config) is not None:
+        return await asyncio.to_thread(_cached_answer, cache_key, inputs, config)
+    return _cached_answer(cache_key, inputs, config)
+
+
+def _finish_request(
+    result: str,
+    config: QAConfig,
+    start_ns: int,
+    cache_key: Optional[str],
+    inputs: Dict[str, str],
+) -> str:
+    """Sanitize the model output, cache it and log request timing."""
+    # Sanitize output before returning
+    logger.debug("Sanitizing output")
+    sanitized_result = sanitize_output(result)
+
+    if cache_key is not None:
+        get_response_cache().set(cache_key, sanitized_result, config.cache_ttl)
+        context_key = _semantic_context_key(inputs, config)
+        if context_key is not None:
+            get_semantic_cache().set(
+                inputs["question"], context_key, sanitized_result, config.cache_ttl
+            )
+
+    # Log execution time
+    elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+    elapsed = elapsed_ms / 1000
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Question answered successfully in %.2fs",
+            elapsed,
             extra={
                 "extra_fields": {
-                    "max_attempts": config.max_retry_attempts,
-                    "last_error": str(e.last_error) if e.last_error else None,
+                    "execution_time_s": elapsed,
+                    "answer_length": len(sanitized_result),
                 }
             },
         )
-        # Re-raise the last error for better error messages
-        if e.last_error:
-            raise e.last_error
-        raise
+
+    # Log slow requests
+    if config.log_slow_requests and elapsed_ms > config.log_slow_request_threshold_ms:
+        logger.warning(
+            "Slow request detected: %.2fs > %ss threshold",
+            elapsed,
+            config.log_slow_request_threshold,
+            extra={"extra_fields": {"slow_request": True}},
+        )
+
+    return sanitized_result
+
+
+async def _afinish_request(
+    result: str,
+    config: QAConfig,
+    start_ns: int,
+    cache_key: Optional[str],
+    inputs: Dict[str, str],
+) -> str:
+    """`_finish_request` for async callers, embedding off the event loop."""
+    if cache_key is not None and _semantic_context_key(inputs, config) is not None:
+        return await asyncio.to_thread(
+            _finish_request, result, config, start_ns, cache_key, inputs
+        )
+    return _finish_request(result, config, start_ns, cache_key, inputs)
+
+
+def _log_request_error(error: Exception, start_ns: int) -> None:
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+    logger.error(
+        "Error processing question: %s",
+        error,
+        extra={
+            "extra_fields": {
+                "execution_time_s": elapsed,
+                "error_type": type(error).__name__,
+            }
+        },
+        exc_info=True,
+    )
 
 
 def answer_question(question: str, context: str, config: QAConfig | None = None) -> str:
@@ -158,79 +682,222 @@ def answer_question(question: str, context: str, config: QAConfig | None = None)
         >>> print(answer)
         'Paris' or 'The capital is Paris.'
     """
-    cfg = config or QAConfig()
+    cfg = config or DEFAULT_CONFIG
+    _setup_request_logging(cfg)
+    start_ns = time.perf_counter_ns()
 
-    # Set up logging based on config
-    if cfg.enable_debug_mode:
-        setup_logging("DEBUG", cfg.log_format, cfg.log_file)
-    else:
-        setup_logging(cfg.log_level, cfg.log_format, cfg.log_file)
+    with _request_log_context(question, context, cfg):
+        logger.info("Processing question: %s...", question[:50])
 
-    start_time = time.time()
+        try:
+            _validate_request(question, context, cfg)
+            inputs = _preprocess_request(question, context, cfg)
+            short_circuit = _short_circuit_answer(inputs)
+            if short_circuit is not None:
+                return short_circuit
 
-    # Create log context with question info
-    with LogContext(
-        logger,
-        question_length=len(question),
-        context_length=len(context),
-        model=cfg.model,
-        temperature=cfg.temperature,
-    ):
-        logger.info(f"Processing question: {question[:50]}...")
+            cache_key = _response_cache_key(inputs, cfg)
+            cached = _cached_answer(cache_key, inputs, cfg)
+            if cached is not None:
+                return cached
 
-        try:
-            # Validate inputs and configuration
-            logger.debug("Validating inputs")
-            validate_input(question, context)
-            validate_config(cfg)
-
-            # Check rate limit if enabled
-            if cfg.enable_rate_limiting:
-                logger.debug(f"Checking rate limit for {cfg.rate_limit_identifier}")
-                check_rate_limit(cfg.rate_limit_identifier)
-
-            # Build and run the chain
-            logger.debug("Building LangChain pipeline")
             chain = build_chain(cfg)
 
             logger.info("Invoking LLM chain")
-            result: str = _invoke_chain_with_retry(chain, question, context, cfg)
-
-            # Sanitize output before returning
-            logger.debug("Sanitizing output")
-            sanitized_result = sanitize_output(result)
-
-            # Log execution time
-            elapsed = time.time() - start_time
-            logger.info(
-                f"Question answered successfully in {elapsed:.2f}s",
-                extra={
-                    "extra_fields": {
-                        "execution_time_s": elapsed,
-                        "answer_length": len(sanitized_result),
-                    }
-                },
+            result: str = _invoke_chain_with_retry(
+                chain, inputs["question"], inputs["context"], cfg
             )
 
-            # Log slow requests
-            if cfg.log_slow_requests and elapsed > cfg.log_slow_request_threshold:
-                logger.warning(
-                    f"Slow request detected: {elapsed:.2f}s > {cfg.log_slow_request_threshold}s threshold",
-                    extra={"extra_fields": {"slow_request": True}},
+            return _finish_request(result, cfg, start_ns, cache_key, inputs)
+
+        except Exception as e:
+            _log_request_error(e, start_ns)
+            raise
+
+
+def answer_questions(
+    pairs: Sequence[Tuple[str, str]],
+    config: QAConfig | None = None,
+    max_concurrency: int = 8,
+) -> List[str]:
+    """Answer several (question, context) pairs with one batched chain call.
+
+    Each pair is validated, short-circuited and looked up in the response
+    cache exactly as in `answer_question`; the remaining pairs share a single
+    `chain.batch` call, which runs up to ``max_concurrency`` requests at once
+    over the pooled HTTP client. Pairs that fail with a retriable error are
+    retried individually.
+
+    Args:
+        pairs: Sequence of (question, context) tuples.
+        config: Optional QAConfig applied to every pair.
+        max_concurrency: Maximum number of concurrent LLM requests.
+
+    Returns:
+        Answers in the same order as ``pairs``.
+
+    Raises:
+        SecurityError: If any input or the config violates security constraints.
+    """
+    cfg = config or DEFAULT_CONFIG
+    _setup_request_logging(cfg)
+    start_ns = time.perf_counter_ns()
+    logger.info("Processing batch of %d questions", len(pairs))
+
+    try:
+        answers: List[Optional[str]] = []
+        pending: List[Tuple[int, Dict[str, str], Optional[str]]] = []
+        for question, context in pairs:
+            _validate_request(question, context, cfg)
+            inputs = _preprocess_request(question, context, cfg)
+            answer = _short_circuit_answer(inputs)
+            cache_key = None
+            if answer is None:
+                cache_key = _response_cache_key(inputs, cfg)
+                answer = _cached_answer(cache_key, inputs, cfg)
+            if answer is None:
+                pending.append((len(answers), inputs, cache_key))
+            answers.append(answer)
+
+        if pending:
+            chain = build_chain(cfg)
+
+            logger.info("Invoking LLM chain for %d questions", len(pending))
+            results = chain.batch(
+                [inputs for _, inputs, _ in pending],
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True,
+            )
+            for (index, inputs, cache_key), result in zip(pending, results):
+                if isinstance(result, Exception):
+                    if not (cfg.enable_retry and is_retriable_error(result)):
+                        raise result
+                    result = _invoke_chain_with_retry(
+                        chain, inputs["question"], inputs["context"], cfg
+                    )
+                answers[index] = _finish_request(
+                    result, cfg, start_ns, cache_key, inputs
                 )
 
-            return sanitized_result
+        return [answer or "" for answer in answers]
 
-        except Exception as e:
-            elapsed = time.time() - start_time
-            logger.error(
-                f"Error processing question: {str(e)}",
-                extra={
-                    "extra_fields": {
-                        "execution_time_s": elapsed,
-                        "error_type": type(e).__name__,
-                    }
-                },
-                exc_info=True,
+    except Exception as e:
+        _log_request_error(e, start_ns)
+        raise
+
+
+async def answer_question_async(
+    question: str, context: str, config: QAConfig | None = None
+) -> str:
+    """Async version of `answer_question` for use inside an event loop.
+
+    The LLM round-trip is awaited via `chain.ainvoke`, so a single worker can
+    serve many requests concurrently instead of blocking on each call.
+
+    Args:
+        question: The user's question (string).
+        context: A paragraph (or more) with the relevant context.
+        config: Optional QAConfig; uses sensible defaults if not provided.
+
+    Returns:
+        The model's answer as a plain string.
+
+    Raises:
+        SecurityError: If inputs or config violate security constraints.
+    """
+    return await _answer_async(
+        question, context, config or DEFAULT_CONFIG, _ainvoke_chain_with_retry
+    )
+
+
+async def _answer_async(
+    question: str,
+    context: str,
+    cfg: QAConfig,
+    ainvoke: Callable[[Any, str, str, QAConfig], Awaitable[str]],
+) -> str:
+    """Run the async request flow, awaiting `ainvoke` for the LLM round-trip."""
+    _setup_request_logging(cfg)
+    start_ns = time.perf_counter_ns()
+
+    with _request_log_context(question, context, cfg):
+        logger.info("Processing question: %s...", question[:50])
+
+        try:
+            _validate_request(question, context, cfg)
+            inputs = _preprocess_request(question, context, cfg)
+            short_circuit = _short_circuit_answer(inputs)
+            if short_circuit is not None:
+                return short_circuit
+
+            cache_key = _response_cache_key(inputs, cfg)
+            cached = await _acached_answer(cache_key, inputs, cfg)
+            if cached is not None:
+                return cached
+
+            chain = build_chain(cfg)
+
+            logger.info("Invoking LLM chain")
+            result: str = await ainvoke(
+                chain, inputs["question"], inputs["context"], cfg
             )
+
+            return await _afinish_request(result, cfg, start_ns, cache_key, inputs)
+
+        except Exception as e:
+            _log_request_error(e, start_ns)
             raise
+
+
+async def astream_answer(
+    question: str, context: str, config: QAConfig | None = None
+) -> AsyncIterator[str]:
+    """Stream the answer to a question as chunks arrive from the model.
+
+    Validation, caching and rate limiting match `answer_question`, and errors
+    they raise surface on the first iteration. Chunks are yielded as the model
+    produces them, before output sanitization; callers that need the sanitized
+    answer should pass the joined chunks to `sanitize_output`. The sanitized
+    answer is what gets cached.
+
+    Args:
+        question: The user's question (string).
+        context: A paragraph (or more) with the relevant context.
+        config: Optional QAConfig; uses sensible defaults if not provided.
+
+    Yields:
+        Answer text chunks.
+
+    Raises:
+        SecurityError: If inputs or config violate security constraints.
+    """
+    cfg = config or DEFAULT_CONFIG
+    _setup_request_logging(cfg)
+    start_ns = time.perf_counter_ns()
+    logger.info("Processing streamed question: %s...", question[:50])
+
+    try:
+        _validate_request(question, context, cfg)
+        inputs = _preprocess_request(question, context, cfg)
+        direct = _short_circuit_answer(inputs)
+        cache_key = None if direct is not None else _response_cache_key(inputs, cfg)
+        if direct is None:
+            direct = await _acached_answer(cache_key, inputs, cfg)
+        if direct is not None:
+            yield direct
+            return
+
+        chain = build_chain(cfg)
+
+        logger.info("Streaming LLM chain")
+        parts = []
+        async with get_aimd_controller().slot():
+            async for chunk in chain.astream(inputs):
+                parts.append(chunk)
+                yield chunk
+
+        await _afinish_request("".join(parts), cfg, start_ns, cache_key, inputs)
+
+    except Exception as e:
+        _log_request_error(e, start_ns)
+        raise
@@ -1,8 +1,17 @@
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class QAConfig(BaseModel):
-    """Configuration for the QA chain."""
+    """Configuration for the QA chain.
+
+    Configs are immutable (and hashable), so one instance can be validated once
+    and shared by every request; use `model_copy(update=...)` to derive a
+    variant.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     model: str = Field(default="gpt-4o-mini", description="OpenAI chat model name")
     temperature: float = Field(
@@ -13,6 +22,11 @@ class QAConfig(BaseModel):
         ge=500,
         description="Max characters from context to include in prompt",
     )
+    max_context_tokens: int | None = Field(
+        default=None,
+        ge=50,
+        description="Optional max context tokens (tiktoken) included in the prompt",
+    )
     enable_rate_limiting: bool = Field(
         default=True, description="Enable rate limiting for API calls"
     )
@@ -34,6 +48,11 @@ class QAConfig(BaseModel):
     log_file: str | None = Field(
         default=None, description="Optional log file path (logs to stderr by default)"
     )
+    log_buffer_bytes: int = Field(
+        default=0,
+        ge=0,
+        description="Buffer this many bytes of log file output between flushes",
+    )
     enable_debug_mode: bool = Field(
         default=False, description="Enable debug mode with verbose logging"
     )
@@ -64,3 +83,38 @@ class QAConfig(BaseModel):
     retry_jitter: bool = Field(
         default=True, description="Add random jitter to retry delays"
     )
+    retry_strategy: Literal["exponential", "decorrelated"] = Field(
+        default="exponential",
+        description="Backoff strategy; 'decorrelated' spreads out concurrent retries",
+    )
+
+    # Response cache configuration
+    enable_cache: bool = Field(
+        default=True,
+        description="Reuse answers for identical requests (low temperatures only)",
+    )
+    cache_ttl: float = Field(
+        default=3600.0, gt=0, description="Time-to-live for cached answers in seconds"
+    )
+    enable_semantic_cache: bool = Field(
+        default=False,
+        description=(
+            "Reuse answers for paraphrased questions about the same context "
+            "(temperature 0 only; requires sentence-transformers)"
+        ),
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.95,
+        ge=0.0,
+        le=1.0,
+        description="Minimum question similarity for a semantic cache hit",
+    )
+
+    @property
+    def log_slow_request_threshold_ms(self) -> int:
+        """Slow request threshold in whole milliseconds."""
+        return int(self.log_slow_request_threshold * 1000)
+
+
+# Shared default configuration, used when callers do not pass one
+DEFAULT_CONFIG = QAConfig()
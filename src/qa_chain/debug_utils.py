@@ -1,18 +1,50 @@
 """Debug utilities for the QA chain application."""
 
+from __future__ import annotations
+
+import atexit
 import json
 import logging
 import os
+import queue
+import threading
 import time
+from array import array
 from contextlib import contextmanager
-from functools import wraps
-from typing import Any, Callable, Dict, Iterator, List, Optional
+from functools import lru_cache, wraps
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
 
-from .config import QAConfig
 from .logging_config import get_logger
 
+if TYPE_CHECKING:
+    # Only used in annotations; importing it would load pydantic
+    from .config import QAConfig
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
 logger = get_logger(__name__)
 
+# Serialization used for debug dumps
+DumpFormat = Literal["json", "msgpack"]
+
+# Pending (filename, data, format) dumps for the background writer thread
+_dump_queue: "queue.Queue[Tuple[str, Dict[str, Any], DumpFormat]]" = queue.Queue()
+_dump_writer: Optional[threading.Thread] = None
+_dump_writer_lock = threading.Lock()
+
 
 class DebugContext:
     """Context manager for debug mode operations."""
@@ -20,6 +52,7 @@ class DebugContext:
     def __init__(self) -> None:
         """Initialize debug context."""
         self.start_time: float | None = None
+        self.start_ns: int | None = None
         self.debug_info: Dict[str, Any] = {}
         self.checkpoints: List[Dict[str, Any]] = []
 
@@ -30,10 +63,19 @@ class DebugContext:
             name: Checkpoint name
             data: Optional data to record
         """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        # One monotonic clock read serves both fields; wall time is derived
+        # from the wall-clock start recorded on entry
+        elapsed = (
+            (time.monotonic_ns() - self.start_ns) / 1e9
+            if self.start_ns is not None
+            else 0
+        )
         checkpoint = {
             "name": name,
-            "time": time.time(),
-            "elapsed": time.time() - self.start_time if self.start_time else 0,
+            "time": (self.start_time or time.time()) + elapsed,
+            "elapsed": elapsed,
         }
         if data:
             checkpoint["data"] = data
@@ -43,14 +85,15 @@ class DebugContext:
     def __enter__(self) -> "DebugContext":
         """Enter debug context."""
         self.start_time = time.time()
+        self.start_ns = time.monotonic_ns()
         logger.debug("Entering debug context")
         return self
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Exit debug context and log summary."""
-        if self.start_time is None:
+        if self.start_ns is None:
             return
-        total_time = time.time() - self.start_time
+        total_time = (time.monotonic_ns() - self.start_ns) / 1e9
         self.debug_info["total_time"] = total_time
         self.debug_info["checkpoints"] = self.checkpoints
 
@@ -66,6 +109,8 @@ def debug_chain_state(chain_state: Dict[str, Any]) -> None:
     Args:
         chain_state: Current state dictionary from chain
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     logger.debug("Chain state", extra={"extra_fields": {"chain_state": chain_state}})
 
 
@@ -76,6 +121,8 @@ def debug_prompt(prompt_template: str, variables: Dict[str, Any]) -> None:
         prompt_template: The prompt template string
         variables: Variables to be substituted
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     logger.debug(
         "Prompt debug info",
         extra={
@@ -97,42 +144,32 @@ def trace_llm_call(func: Callable) -> Callable:
     Returns:
         Wrapped function with tracing
     """
+    name = func.__name__
 
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
-        start_time = time.time()
-        call_info = {
-            "function": func.__name__,
-            "args_count": len(args),
-            "kwargs": list(kwargs.keys()),
-        }
-
-        logger.debug(
-            f"LLM call started: {func.__name__}", extra={"extra_fields": call_info}
-        )
+        start_ns = time.monotonic_ns()
+        # Trace records are only built when DEBUG is on; a failure is always
+        # logged, so its fields are assembled on that (cold) path instead
+        tracing = logger.isEnabledFor(logging.DEBUG)
+        if tracing:
+            logger.debug(
+                "LLM call started: %s",
+                name,
+                extra={"extra_fields": _call_info(name, args, kwargs)},
+            )
 
         try:
             result = func(*args, **kwargs)
-            elapsed = time.time() - start_time
-            logger.debug(
-                f"LLM call completed: {func.__name__}",
-                extra={
-                    "extra_fields": {
-                        **call_info,
-                        "elapsed_ms": int(elapsed * 1000),
-                        "success": True,
-                    }
-                },
-            )
-            return result
         except Exception as e:
-            elapsed = time.time() - start_time
+            elapsed_ms = (time.monotonic_ns() - start_ns) // 1_000_000
             logger.error(
-                f"LLM call failed: {func.__name__}",
+                "LLM call failed: %s",
+                name,
                 extra={
                     "extra_fields": {
-                        **call_info,
-                        "elapsed_ms": int(elapsed * 1000),
+                        **_call_info(name, args, kwargs),
+                        "elapsed_ms": elapsed_ms,
                         "error": str(e),
                         "error_type": type(e).__name__,
                     }
@@ -141,9 +178,36 @@ def trace_llm_call(func: Callable) -> Callable:
             )
             raise
 
+        if tracing:
+            elapsed_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+            logger.debug(
+                "LLM call completed: %s",
+                name,
+                extra={
+                    "extra_fields": {
+                        **_call_info(name, args, kwargs),
+                        "elapsed_ms": elapsed_ms,
+                        "success": True,
+                    }
+                },
+            )
+        return result
+
     return wrapper
 
 
+def _call_info(name: str, args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {"function": name, "args_count": len(args), "kwargs": list(kwargs)}
+
+
+@lru_cache(maxsize=1)
+def _process(pid: int) -> Any:
+    """Return a psutil handle for the process, created once per pid."""
+    import psutil
+
+    return psutil.Process(pid)
+
+
 def log_memory_usage() -> Dict[str, float]:
     """Log current memory usage.
 
@@ -151,9 +215,8 @@ def log_memory_usage() -> Dict[str, float]:
         Dictionary with memory stats in MB
     """
     try:
-        import psutil
-
-        process = psutil.Process(os.getpid())
+        # Keyed by pid so a forked child does not report its parent
+        process = _process(os.getpid())
         memory_info = process.memory_info()
 
         memory_stats = {
@@ -175,6 +238,8 @@ def debug_config(config: QAConfig) -> None:
     Args:
         config: QAConfig instance
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     config_dict = config.model_dump()
     logger.debug("Configuration", extra={"extra_fields": {"config": config_dict}})
 
@@ -201,6 +266,58 @@ def debug_mode(enable: bool = True) -> Iterator[None]:
         logger.debug("Debug mode disabled")
 
 
+def _msgpack() -> Any:
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError(
+            "msgpack debug dumps require msgpack (pip install msgpack)"
+        ) from e
+    return msgpack
+
+
+def _write_debug_dump(
+    filename: str, debug_data: Dict[str, Any], dump_format: DumpFormat = "json"
+) -> None:
+    try:
+        if dump_format == "msgpack":
+            payload = _msgpack().packb(debug_data, use_bin_type=True)
+        elif orjson is not None:
+            payload = orjson.dumps(debug_data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(debug_data, indent=2).encode()
+        with open(filename, "wb") as f:
+            f.write(payload)
+        logger.debug(f"Debug info dumped to {filename}")
+    except Exception as e:
+        logger.error(f"Failed to dump debug info: {str(e)}")
+
+
+def _run_dump_writer() -> None:
+    while True:
+        filename, debug_data, dump_format = _dump_queue.get()
+        try:
+            _write_debug_dump(filename, debug_data, dump_format)
+        finally:
+            _dump_queue.task_done()
+
+
+def _start_dump_writer() -> None:
+    global _dump_writer
+    with _dump_writer_lock:
+        if _dump_writer is None:
+            _dump_writer = threading.Thread(
+                target=_run_dump_writer, name="qa-debug-dump", daemon=True
+            )
+            _dump_writer.start()
+            atexit.register(_dump_queue.join)
+
+
+def wait_for_debug_dumps() -> None:
+    """Block until all background debug dumps have been written."""
+    _dump_queue.join()
+
+
 def dump_debug_info(
     question: str,
     context: str,
@@ -208,6 +325,8 @@ def dump_debug_info(
     config: QAConfig,
     execution_time: float,
     filename: Optional[str] = None,
+    background: bool = False,
+    dump_format: DumpFormat = "json",
 ) -> None:
     """Dump debug information to a file.
 
@@ -218,9 +337,19 @@ def dump_debug_info(
         config: Configuration used
         execution_time: Total execution time
         filename: Optional filename (defaults to timestamp)
+        background: Hand the write to a single background writer thread and
+            return immediately; see `wait_for_debug_dumps`
+        dump_format: "json" (indented, human-readable) or "msgpack" (compact
+            binary, smaller and faster to write)
+
+    Raises:
+        ImportError: If dump_format is "msgpack" and msgpack is not installed
     """
     if not config.enable_debug_mode:
         return
+    if dump_format == "msgpack":
+        # Fail in the caller, not later on the background writer thread
+        _msgpack()
 
     debug_data = {
         "timestamp": time.time(),
@@ -239,14 +368,13 @@ def dump_debug_info(
     }
 
     if not filename:
-        filename = f"debug_{int(time.time())}.json"
+        filename = f"debug_{int(time.time())}.{dump_format}"
 
-    try:
-        with open(filename, "w") as f:
-            json.dump(debug_data, f, indent=2)
-        logger.debug(f"Debug info dumped to {filename}")
-    except Exception as e:
-        logger.error(f"Failed to dump debug info: {str(e)}")
+    if background:
+        _start_dump_writer()
+        _dump_queue.put((filename, debug_data, dump_format))
+    else:
+        _write_debug_dump(filename, debug_data, dump_format)
 
 
 class DebugStats:
@@ -254,7 +382,8 @@ class DebugStats:
 
     def __init__(self) -> None:
         """Initialize stats collector."""
-        self.stats: Dict[str, List[float]] = {}
+        # Packed doubles: 8 bytes per sample instead of a boxed float each
+        self.stats: Dict[str, array[float]] = {}
 
     def record(self, metric: str, value: float) -> None:
         """Record a metric value.
@@ -263,12 +392,15 @@ class DebugStats:
             metric: Metric name
             value: Metric value
         """
-        if metric not in self.stats:
-            self.stats[metric] = []
-        self.stats[metric].append(value)
+        values = self.stats.get(metric)
+        if values is None:
+            values = self.stats[metric] = array("d")
+        values.append(value)
 
     def log_summary(self) -> None:
         """Log summary statistics."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         summary = {}
         for metric, values in self.stats.items():
             if values:
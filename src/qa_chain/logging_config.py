@@ -3,25 +3,51 @@
 import json
 import logging
 import sys
+import threading
 import time
-from contextvars import ContextVar
+from contextvars import ContextVar, Token, copy_context
 from functools import wraps
-from typing import Any, Callable, Optional
-from uuid import uuid4
+from types import MappingProxyType
+from typing import Any, BinaryIO, Callable, Dict, Mapping, Optional, Tuple, cast
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
 
 # Context variable for request ID tracking
 request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_get_request_id = request_id_var.get
+
+# Fields added by the innermost active LogContext; per task and thread, so
+# concurrent requests sharing a logger don't see each other's fields
+log_fields_var: ContextVar[Mapping[str, Any]] = ContextVar(
+    "log_fields", default=MappingProxyType({})
+)
+_get_log_fields = log_fields_var.get
+
+# Set once setup_logging() has installed handlers on the root logger
+_logging_configured = False
 
 
 class StructuredFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
 
-    def format(self, record: logging.LogRecord) -> str:
-        """Format log record as JSON."""
+    # (second, formatted timestamp) of the most recent record; records within
+    # the same second reuse the string instead of calling localtime/strftime
+    _last_timestamp: Tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        last_second, formatted = self._last_timestamp
+        if second != last_second:
+            formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+            self._last_timestamp = (second, formatted)
+        return formatted
+
+    def _log_data(self, record: logging.LogRecord) -> Dict[str, Any]:
         log_data = {
-            "timestamp": time.strftime(
-                "%Y-%m-%d %H:%M:%S", time.localtime(record.created)
-            ),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -31,23 +57,117 @@ class StructuredFormatter(logging.Formatter):
         }
 
         # Add request ID if available
-        request_id = request_id_var.get()
+        request_id = _get_request_id()
         if request_id:
             log_data["request_id"] = request_id
 
-        # Add extra fields
+        # Add extra fields; those of the active LogContext take precedence
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
+        log_data.update(_get_log_fields())
 
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data)
+        return log_data
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format log record as JSON."""
+        log_data = self._log_data(record)
+        # Extra fields may hold values JSON can't encode (datetimes, UUIDs,
+        # paths); log their str() rather than failing the record
+        if orjson is not None:
+            return orjson.dumps(
+                log_data, default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        return json.dumps(log_data, separators=(",", ":"), default=str)
+
+    def format_line(self, record: logging.LogRecord) -> bytes:
+        """Format log record as a newline-terminated UTF-8 JSON line.
+
+        With orjson this is the encoder's output as is, skipping the
+        bytes -> str -> bytes round trip `format` plus a text stream costs.
+        """
+        if orjson is None:
+            return (self.format(record) + "\n").encode()
+        return orjson.dumps(
+            self._log_data(record),
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+        )
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that buffers records instead of flushing each one.
+
+    `logging.FileHandler` flushes after every record, costing one ``write()``
+    syscall per log line. This handler lets the file buffer fill up to
+    ``buffer_bytes`` and flushes it from a background thread every
+    ``flush_interval`` seconds, on `flush()`/`close()`, and at interpreter
+    exit via `logging.shutdown`. The file is written in binary mode, and
+    records from a `StructuredFormatter` go in as encoded JSON bytes.
+    """
+
+    def __init__(
+        self, filename: str, buffer_bytes: int = 65536, flush_interval: float = 1.0
+    ):
+        """Initialize the handler.
+
+        Args:
+            filename: Log file path, opened for appending
+            buffer_bytes: Size of the write buffer in bytes
+            flush_interval: Seconds between background flushes
+        """
+        self.buffer_bytes = buffer_bytes
+        super().__init__(filename, encoding="utf-8")
+        self._stop_flushing = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically,
+            args=(flush_interval,),
+            name="log-flush",
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def _open(self) -> BinaryIO:  # type: ignore[override]
+        return open(self.baseFilename, "ab", buffering=self.buffer_bytes)
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stop_flushing.wait(interval):
+            self.flush()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write the record to the buffer without flushing."""
+        try:
+            if isinstance(self.formatter, StructuredFormatter):
+                line = self.formatter.format_line(record)
+            else:
+                line = (self.format(record) + self.terminator).encode(
+                    "utf-8", "backslashreplace"
+                )
+            with self.lock:  # type: ignore[union-attr]
+                # FileHandler types its stream as text; this one is binary
+                stream = cast(BinaryIO, self.stream)
+                if stream is None:
+                    stream = self.stream = self._open()
+                stream.write(line)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        """Stop the background flusher, then flush and close the file."""
+        self._stop_flushing.set()
+        super().close()
 
 
 def setup_logging(
-    level: str = "INFO", format_type: str = "json", log_file: Optional[str] = None
+    level: str = "INFO",
+    format_type: str = "json",
+    log_file: Optional[str] = None,
+    buffer_bytes: int = 0,
 ) -> None:
     """Set up logging configuration.
 
@@ -55,17 +175,26 @@ def setup_logging(
         level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         format_type: Format type ('json' for structured, 'simple' for human-readable)
         log_file: Optional file path for logging (logs to stderr by default)
+        buffer_bytes: Buffer up to this many bytes of file output between
+            flushes (0 flushes every record)
     """
+    global _logging_configured
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, level.upper()))
 
-    # Remove existing handlers
+    # Remove existing handlers, writing out anything they still buffer
+    for old_handler in root_logger.handlers:
+        if isinstance(old_handler, BufferedFileHandler):
+            old_handler.close()
     root_logger.handlers = []
 
     # Create handler
     handler: logging.Handler
-    if log_file:
+    if log_file and buffer_bytes > 0:
+        handler = BufferedFileHandler(log_file, buffer_bytes)
+    elif log_file:
         handler = logging.FileHandler(log_file)
     else:
         handler = logging.StreamHandler(sys.stderr)
@@ -87,6 +216,13 @@ def setup_logging(
     logging.getLogger("openai").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
+    _logging_configured = True
+
+
+def is_logging_configured() -> bool:
+    """Return True once setup_logging() has been called in this process."""
+    return _logging_configured
+
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with the given name.
@@ -113,12 +249,17 @@ def with_request_id(request_id: Optional[str] = None) -> Callable:
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            rid = request_id or str(uuid4())
-            token = request_id_var.set(rid)
-            try:
-                return func(*args, **kwargs)
-            finally:
-                request_id_var.reset(token)
+            if request_id:
+                rid = request_id
+            else:
+                from uuid import uuid4
+
+                rid = str(uuid4())
+            # Run in a copy of the current context, so the caller's request
+            # ID is untouched without any reset bookkeeping
+            ctx = copy_context()
+            ctx.run(request_id_var.set, rid)
+            return ctx.run(func, *args, **kwargs)
 
         return wrapper
 
@@ -166,11 +307,15 @@ def log_with_context(**extra_fields: Any) -> Callable:
     return decorator
 
 
-def log_execution_time(logger: Optional[logging.Logger] = None) -> Callable:
+def log_execution_time(
+    logger: Optional[logging.Logger] = None,
+    clock: Callable[[], int] = time.monotonic_ns,
+) -> Callable:
     """Decorator to log function execution time.
 
     Args:
         logger: Optional logger instance. If not provided, uses function's module logger.
+        clock: Clock returning nanoseconds, monotonic by default
 
     Returns:
         Decorator function
@@ -180,22 +325,22 @@ def log_execution_time(logger: Optional[logging.Logger] = None) -> Callable:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             log = logger or get_logger(func.__module__)
-            start_time = time.time()
+            start_ns = clock()
 
             log.debug(f"Starting {func.__name__}")
             try:
                 result = func(*args, **kwargs)
-                elapsed = time.time() - start_time
+                elapsed_ms = (clock() - start_ns) // 1_000_000
                 log.info(
                     f"Completed {func.__name__}",
-                    extra={"extra_fields": {"execution_time_ms": int(elapsed * 1000)}},
+                    extra={"extra_fields": {"execution_time_ms": elapsed_ms}},
                 )
                 return result
             except Exception as e:
-                elapsed = time.time() - start_time
+                elapsed_ms = (clock() - start_ns) // 1_000_000
                 log.error(
                     f"Failed {func.__name__}: {str(e)}",
-                    extra={"extra_fields": {"execution_time_ms": int(elapsed * 1000)}},
+                    extra={"extra_fields": {"execution_time_ms": elapsed_ms}},
                     exc_info=True,
                 )
                 raise
@@ -206,7 +351,13 @@ def log_execution_time(logger: Optional[logging.Logger] = None) -> Callable:
 
 
 class LogContext:
-    """Context manager for adding fields to logs within a block."""
+    """Context manager for adding fields to logs within a block.
+
+    The fields live in a context variable read by `StructuredFormatter`, so
+    they apply to records logged by the current task or thread only. They
+    override a record's own ``extra_fields`` of the same name, and nested
+    contexts add to (and override) the fields of the enclosing one.
+    """
 
     def __init__(self, logger: logging.Logger, **fields: Any):
         """Initialize log context.
@@ -217,30 +368,14 @@ class LogContext:
         """
         self.logger = logger
         self.fields = fields
-        self.original_class: type[logging.Logger] | None = None
+        self._token: Optional[Token] = None
 
     def __enter__(self) -> None:
-        """Enter context and modify logger."""
-        # Store original logger class
-        self.original_class = self.logger.__class__
-
-        # Store fields reference
-        parent = self
-
-        # Create a custom logger class with extra fields
-        class ContextLogger(self.original_class):  # type: ignore
-            def _log(self, level: int, msg: str, args: tuple, **kwargs: Any) -> None:
-                if "extra" not in kwargs:
-                    kwargs["extra"] = {}
-                if "extra_fields" not in kwargs["extra"]:
-                    kwargs["extra"]["extra_fields"] = {}
-                kwargs["extra"]["extra_fields"].update(parent.fields)
-                super()._log(level, msg, args, **kwargs)
-
-        # Replace logger's class
-        self.logger.__class__ = ContextLogger
+        """Enter context and start adding fields to structured records."""
+        self._token = log_fields_var.set({**_get_log_fields(), **self.fields})
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        """Exit context and restore logger."""
-        if self.original_class is not None:
-            self.logger.__class__ = self.original_class
+        """Exit context and restore the enclosing fields."""
+        if self._token is not None:
+            log_fields_var.reset(self._token)
+            self._token = None
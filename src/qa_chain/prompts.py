@@ -1,22 +1,29 @@
+import functools
+
 from langchain_core.prompts import ChatPromptTemplate
 
+NO_ANSWER = "I don't know based on the provided context."
+
 SYSTEM_PROMPT = (
     "You are a careful assistant. Use ONLY the provided context to answer the user's question. "
     "If the answer cannot be determined from the context, reply exactly: "
-    "'I don't know based on the provided context.'"
+    f"'{NO_ANSWER}'"
 )
 
-HUMAN_TEMPLATE = (
-    "Context:\n{context}\n\n"
-    "Question: {question}\n\n"
-    "Answer concisely and directly:"
-)
+# The context gets its own message right after the system prompt, so requests
+# about the same document share a byte-identical prefix that the provider's
+# prompt cache can reuse; only the trailing question message varies.
+CONTEXT_TEMPLATE = "Context:\n{context}"
+
+QUESTION_TEMPLATE = "Question: {question}\n\nAnswer concisely and directly:"
 
 
+@functools.lru_cache(maxsize=1)
 def build_prompt() -> ChatPromptTemplate:
     return ChatPromptTemplate.from_messages(
         [
             ("system", SYSTEM_PROMPT),
-            ("human", HUMAN_TEMPLATE),
+            ("human", CONTEXT_TEMPLATE),
+            ("human", QUESTION_TEMPLATE),
         ]
     )
@@ -1,26 +1,78 @@
 """Simple rate limiter for API calls."""
 
 import time
-from collections import defaultdict, deque
 from threading import Lock
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
 
 class RateLimiter:
-    """Thread-safe rate limiter using sliding window algorithm."""
+    """Thread-safe rate limiter using a token bucket per identifier.
 
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+    Each identifier's bucket holds up to ``max_requests`` tokens and refills at
+    ``max_requests / window_seconds`` tokens per second, so sustained traffic is
+    capped at ``max_requests`` per window while short bursts up to the bucket
+    size are allowed. A check is constant time regardless of traffic.
+
+    A bucket left idle for a whole window has refilled completely, so it is
+    indistinguishable from a new one; once more than ``max_identifiers`` are
+    tracked, idle buckets are evicted to keep memory bounded.
+    """
+
+    def __init__(
+        self,
+        max_requests: int = 10,
+        window_seconds: float = 60,
+        time_func: Callable[[], float] = time.monotonic,
+        max_identifiers: int = 10000,
+    ):
         """Initialize rate limiter.
 
         Args:
             max_requests: Maximum number of requests allowed in window
             window_seconds: Time window in seconds
+            time_func: Clock returning seconds, monotonic by default
+            max_identifiers: Number of tracked identifiers above which idle
+                ones are evicted
         """
+        self._now = time_func
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[str, deque] = defaultdict(deque)
+        self.refill_rate = max_requests / window_seconds
+        self.max_identifiers = max_identifiers
+        # Evict when the table grows past this; raised while most identifiers
+        # are active so sweeps stay amortized constant time
+        self._evict_above = max_identifiers
+        # identifier -> (tokens, last refill time)
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+        # One lock per identifier so unrelated callers never contend; the
+        # meta-lock guards creating and evicting them
+        self.locks: Dict[str, Lock] = {}
         self.lock = Lock()
 
+    def _lock_for(self, identifier: str) -> Lock:
+        lock = self.locks.get(identifier)
+        if lock is None:
+            with self.lock:
+                lock = self.locks.setdefault(identifier, Lock())
+        return lock
+
+    def _evict_idle(self, now: float) -> None:
+        with self.lock:
+            if len(self.locks) <= self._evict_above:
+                return
+            for identifier, lock in list(self.locks.items()):
+                # Skip identifiers a check is using right now
+                if not lock.acquire(blocking=False):
+                    continue
+                try:
+                    bucket = self.buckets.get(identifier)
+                    if bucket is None or now - bucket[1] >= self.window_seconds:
+                        self.buckets.pop(identifier, None)
+                        del self.locks[identifier]
+                finally:
+                    lock.release()
+            self._evict_above = max(self.max_identifiers, 2 * len(self.locks))
+
     def is_allowed(self, identifier: str) -> Tuple[bool, Optional[float]]:
         """Check if request is allowed for given identifier.
 
@@ -30,23 +82,30 @@ class RateLimiter:
         Returns:
             Tuple of (is_allowed, seconds_until_retry)
         """
-        with self.lock:
-            now = time.time()
-            request_times = self.requests[identifier]
-
-            # Remove old requests outside window
-            while request_times and request_times[0] <= now - self.window_seconds:
-                request_times.popleft()
-
-            # Check if under limit
-            if len(request_times) < self.max_requests:
-                request_times.append(now)
-                return True, None
-            else:
-                # Calculate when the oldest request will expire
-                oldest_request = request_times[0]
-                seconds_until_retry = (oldest_request + self.window_seconds) - now
-                return False, seconds_until_retry
+        if len(self.locks) > self._evict_above:
+            self._evict_idle(self._now())
+
+        while True:
+            lock = self._lock_for(identifier)
+            with lock:
+                # The lock may have been evicted while we waited for it
+                if self.locks.get(identifier) is lock:
+                    return self._take(identifier)
+
+    def _take(self, identifier: str) -> Tuple[bool, Optional[float]]:
+        # Caller holds the identifier's lock
+        now = self._now()
+        tokens, last = self.buckets.get(identifier, (self.max_requests, now))
+
+        # Refill for the time elapsed since the last check
+        tokens = min(self.max_requests, tokens + (now - last) * self.refill_rate)
+
+        if tokens >= 1:
+            self.buckets[identifier] = (tokens - 1, now)
+            return True, None
+
+        self.buckets[identifier] = (tokens, now)
+        return False, (1 - tokens) / self.refill_rate
 
     def reset(self, identifier: Optional[str] = None) -> None:
         """Reset rate limit tracking.
@@ -54,11 +113,12 @@ class RateLimiter:
         Args:
             identifier: Reset specific identifier, or all if None
         """
-        with self.lock:
-            if identifier:
-                self.requests.pop(identifier, None)
-            else:
-                self.requests.clear()
+        if identifier:
+            with self._lock_for(identifier):
+                self.buckets.pop(identifier, None)
+        else:
+            with self.lock:
+                self.buckets.clear()
 
 
 # Global rate limiter instance (can be configured per deployment)
@@ -83,7 +143,7 @@ def check_rate_limit(identifier: str = "global") -> None:
         )
 
 
-def configure_rate_limiter(max_requests: int, window_seconds: int) -> None:
+def configure_rate_limiter(max_requests: int, window_seconds: float) -> None:
     """Configure the global rate limiter.
 
     Args:
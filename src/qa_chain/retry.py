@@ -1,8 +1,12 @@
 """Retry logic for handling API failures."""
 
-import time
+import asyncio
+import math
+import random
+import re
+import threading
 from functools import wraps
-from typing import Any, Callable, Optional, Type
+from typing import Any, Callable, Literal, Optional, Type
 
 from .logging_config import get_logger
 
@@ -15,6 +19,9 @@ RETRIABLE_ERRORS = (
     IOError,
 )
 
+# HTTP status codes of API errors that should trigger retries
+RETRIABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
 # Error messages that indicate retriable conditions
 RETRIABLE_ERROR_MESSAGES = [
     "rate limit",
@@ -27,6 +34,15 @@ RETRIABLE_ERROR_MESSAGES = [
     "too many requests",
 ]
 
+# All retriable messages in one alternation, so an error message is scanned once
+RETRIABLE_ERROR_RE = re.compile("|".join(map(re.escape, RETRIABLE_ERROR_MESSAGES)))
+
+# How successive retry delays are chosen
+BackoffStrategy = Literal["exponential", "decorrelated"]
+
+# Set to cut short every synchronous backoff wait, e.g. on shutdown
+_shutdown = threading.Event()
+
 
 class RetryError(Exception):
     """Raised when all retry attempts have been exhausted."""
@@ -36,31 +52,67 @@ class RetryError(Exception):
         self.last_error = last_error
 
 
+def interrupt_retries() -> None:
+    """Wake synchronous retries waiting out a backoff delay.
+
+    Waiting retries, and any that start backing off afterwards, raise
+    `RetryError` instead of sleeping. Call this from a shutdown or signal
+    handler so a pending retry does not hold the process for up to
+    ``max_delay`` seconds. Async retries are already interrupted by
+    cancelling their task.
+
+    The flag is process-wide and sticky: retries keep failing fast until
+    `resume_retries` is called, e.g. when an application starts up again in
+    the same process.
+    """
+    _shutdown.set()
+
+
+def resume_retries() -> None:
+    """Allow synchronous retries to back off again after `interrupt_retries`."""
+    _shutdown.clear()
+
+
 def exponential_backoff(
     attempt: int,
     base_delay: float = 1.0,
     max_delay: float = 60.0,
     jitter: bool = True,
+    strategy: BackoffStrategy = "exponential",
+    prev_delay: float = 0.0,
 ) -> float:
     """Calculate exponential backoff delay.
 
+    The ``"decorrelated"`` strategy draws each delay uniformly between
+    ``base_delay`` and three times the previous one, so clients that failed
+    together do not retry in lockstep; ``jitter`` does not apply to it.
+
     Args:
         attempt: Current attempt number (0-based)
         base_delay: Base delay in seconds
         max_delay: Maximum delay in seconds
         jitter: Whether to add random jitter
+        strategy: "exponential" or "decorrelated"
+        prev_delay: Previous delay in seconds, used by "decorrelated"
 
     Returns:
         Delay in seconds
     """
-    delay: float = min(base_delay * (2**attempt), max_delay)
+    if strategy == "decorrelated":
+        delay = random.uniform(base_delay, max(base_delay, prev_delay) * 3)
+        return delay if delay < max_delay else max_delay
+
+    # base_delay * 2**attempt without building the power as an int
+    try:
+        delay = math.ldexp(base_delay, attempt)
+    except OverflowError:
+        delay = max_delay
+    if delay > max_delay:
+        delay = max_delay
 
     if jitter:
-        import random
-
         # Add up to 25% jitter
-        jitter_amount: float = delay * 0.25 * random.random()
-        delay = delay + jitter_amount
+        delay *= 1 + 0.25 * random.random()
 
     return delay
 
@@ -78,19 +130,80 @@ def is_retriable_error(error: Exception) -> bool:
     if isinstance(error, RETRIABLE_ERRORS):
         return True
 
+    # Check for specific API errors (cheaper than formatting the message)
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) in RETRIABLE_STATUS_CODES:
+        return True
+
     # Check error message for retriable conditions
-    error_message = str(error).lower()
-    for pattern in RETRIABLE_ERROR_MESSAGES:
-        if pattern in error_message:
-            return True
+    return RETRIABLE_ERROR_RE.search(str(error).lower()) is not None
+
+
+def _retry_delay(
+    func: Callable,
+    error: Exception,
+    attempt: int,
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float,
+    retriable_exceptions: tuple[Type[Exception], ...],
+    on_retry: Optional[Callable[[Exception, int], None]],
+    strategy: BackoffStrategy = "exponential",
+    prev_delay: float = 0.0,
+) -> float:
+    """Return the delay before retrying after a failed attempt, or raise.
 
-    # Check for specific API errors
-    if hasattr(error, "response"):
-        status_code = getattr(error.response, "status_code", None)
-        if status_code in [429, 500, 502, 503, 504]:
-            return True
+    Shared by the sync and async wrappers of `retry_with_exponential_backoff`.
+    """
+    # Check if we should retry
+    if not is_retriable_error(error) and not isinstance(error, retriable_exceptions):
+        logger.error(
+            f"Non-retriable error in {func.__name__}: {error}",
+            exc_info=True,
+        )
+        raise error
+
+    # Check if we've exhausted attempts
+    if attempt >= max_attempts - 1:
+        logger.error(
+            f"All {max_attempts} attempts failed for {func.__name__}",
+            extra={
+                "extra_fields": {
+                    "function": func.__name__,
+                    "attempts": max_attempts,
+                    "last_error": str(error),
+                }
+            },
+        )
+        raise RetryError(f"Failed after {max_attempts} attempts", last_error=error)
+
+    # Calculate delay
+    delay = exponential_backoff(
+        attempt, base_delay, max_delay, strategy=strategy, prev_delay=prev_delay
+    )
+
+    logger.warning(
+        f"Retriable error in {func.__name__} (attempt {attempt + 1}/{max_attempts}): "
+        f"{error}. Retrying in {delay:.1f}s...",
+        extra={
+            "extra_fields": {
+                "function": func.__name__,
+                "attempt": attempt + 1,
+                "max_attempts": max_attempts,
+                "delay_seconds": delay,
+                "error_type": type(error).__name__,
+            }
+        },
+    )
+
+    # Call retry callback if provided
+    if on_retry:
+        try:
+            on_retry(error, attempt + 1)
+        except Exception as callback_error:
+            logger.error(f"Error in retry callback: {callback_error}")
 
-    return False
+    return delay
 
 
 def retry_with_exponential_backoff(
@@ -99,31 +212,82 @@ def retry_with_exponential_backoff(
     max_delay: float = 60.0,
     retriable_exceptions: Optional[tuple[Type[Exception], ...]] = None,
     on_retry: Optional[Callable[[Exception, int], None]] = None,
+    strategy: BackoffStrategy = "exponential",
 ) -> Callable:
     """Decorator for retrying functions with exponential backoff.
 
+    Coroutine functions get an async wrapper that awaits `asyncio.sleep`
+    between attempts, so backoff never blocks the event loop.
+
     Args:
         max_attempts: Maximum number of attempts
         base_delay: Base delay between retries in seconds
         max_delay: Maximum delay between retries
         retriable_exceptions: Tuple of exceptions to retry on
         on_retry: Optional callback called on each retry
+        strategy: Backoff strategy, "exponential" or "decorrelated"
 
     Returns:
         Decorated function
     """
-    if retriable_exceptions is None:
-        retriable_exceptions = RETRIABLE_ERRORS
+    retriable = retriable_exceptions or RETRIABLE_ERRORS
 
     def decorator(func: Callable) -> Callable:
+        def delay_after(error: Exception, attempt: int, prev_delay: float) -> float:
+            return _retry_delay(
+                func,
+                error,
+                attempt,
+                max_attempts,
+                base_delay,
+                max_delay,
+                retriable,
+                on_retry,
+                strategy,
+                prev_delay,
+            )
+
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                delay = 0.0
+                for attempt in range(max_attempts):
+                    try:
+                        logger.debug(
+                            "Attempting %s (attempt %d/%d)",
+                            func.__name__,
+                            attempt + 1,
+                            max_attempts,
+                        )
+                        result = await func(*args, **kwargs)
+
+                        if attempt > 0:
+                            logger.info(
+                                f"Successfully completed {func.__name__} after {attempt + 1} attempts"
+                            )
+
+                        return result
+
+                    except Exception as error:
+                        delay = delay_after(error, attempt, delay)
+                        await asyncio.sleep(delay)
+
+                # This should never be reached due to the raise in the loop
+                raise RetryError(f"Failed after {max_attempts} attempts")
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            last_error: Optional[Exception] = None
-
+            delay = 0.0
             for attempt in range(max_attempts):
                 try:
                     logger.debug(
-                        f"Attempting {func.__name__} (attempt {attempt + 1}/{max_attempts})"
+                        "Attempting %s (attempt %d/%d)",
+                        func.__name__,
+                        attempt + 1,
+                        max_attempts,
                     )
                     result = func(*args, **kwargs)
 
@@ -135,65 +299,15 @@ def retry_with_exponential_backoff(
                     return result
 
                 except Exception as error:
-                    last_error = error
-
-                    # Check if we should retry
-                    if not is_retriable_error(error) and not isinstance(
-                        error, retriable_exceptions
-                    ):
-                        logger.error(
-                            f"Non-retriable error in {func.__name__}: {error}",
-                            exc_info=True,
-                        )
-                        raise
-
-                    # Check if we've exhausted attempts
-                    if attempt >= max_attempts - 1:
-                        logger.error(
-                            f"All {max_attempts} attempts failed for {func.__name__}",
-                            extra={
-                                "extra_fields": {
-                                    "function": func.__name__,
-                                    "attempts": max_attempts,
-                                    "last_error": str(error),
-                                }
-                            },
-                        )
+                    # Wait before retrying, unless retries were interrupted
+                    delay = delay_after(error, attempt, delay)
+                    if _shutdown.wait(delay):
                         raise RetryError(
-                            f"Failed after {max_attempts} attempts", last_error=error
-                        )
-
-                    # Calculate delay
-                    delay = exponential_backoff(attempt, base_delay, max_delay)
-
-                    logger.warning(
-                        f"Retriable error in {func.__name__} (attempt {attempt + 1}/{max_attempts}): "
-                        f"{error}. Retrying in {delay:.1f}s...",
-                        extra={
-                            "extra_fields": {
-                                "function": func.__name__,
-                                "attempt": attempt + 1,
-                                "max_attempts": max_attempts,
-                                "delay_seconds": delay,
-                                "error_type": type(error).__name__,
-                            }
-                        },
-                    )
-
-                    # Call retry callback if provided
-                    if on_retry:
-                        try:
-                            on_retry(error, attempt + 1)
-                        except Exception as callback_error:
-                            logger.error(f"Error in retry callback: {callback_error}")
-
-                    # Wait before retrying
-                    time.sleep(delay)
+                            "Retry interrupted by shutdown", last_error=error
+                        ) from error
 
             # This should never be reached due to the raise in the loop
-            raise RetryError(
-                f"Failed after {max_attempts} attempts", last_error=last_error
-            )
+            raise RetryError(f"Failed after {max_attempts} attempts")
 
         return wrapper
 
@@ -212,6 +326,7 @@ class RetryPolicy:
         jitter: bool = True,
         retriable_status_codes: Optional[list[int]] = None,
         retriable_exceptions: Optional[tuple[Type[Exception], ...]] = None,
+        strategy: BackoffStrategy = "exponential",
     ):
         """Initialize retry policy.
 
@@ -223,6 +338,7 @@ class RetryPolicy:
             jitter: Whether to add jitter to delays
             retriable_status_codes: HTTP status codes to retry
             retriable_exceptions: Exception types to retry
+            strategy: Backoff strategy, "exponential" or "decorrelated"
         """
         self.max_attempts = max_attempts
         self.base_delay = base_delay
@@ -237,6 +353,7 @@ class RetryPolicy:
             504,
         ]
         self.retriable_exceptions = retriable_exceptions or RETRIABLE_ERRORS
+        self.strategy = strategy
 
     def should_retry(self, error: Exception, attempt: int) -> bool:
         """Check if we should retry after an error.
@@ -253,17 +370,23 @@ class RetryPolicy:
 
         return is_retriable_error(error) or isinstance(error, self.retriable_exceptions)
 
-    def get_delay(self, attempt: int) -> float:
+    def get_delay(self, attempt: int, prev_delay: float = 0.0) -> float:
         """Get delay before next retry.
 
         Args:
             attempt: Current attempt number (0-based)
+            prev_delay: Previous delay in seconds, for the decorrelated strategy
 
         Returns:
             Delay in seconds
         """
         return exponential_backoff(
-            attempt, self.base_delay, self.max_delay, self.jitter
+            attempt,
+            self.base_delay,
+            self.max_delay,
+            self.jitter,
+            self.strategy,
+            prev_delay,
         )
 
     def as_decorator(self) -> Callable:
@@ -277,4 +400,21 @@ class RetryPolicy:
             base_delay=self.base_delay,
             max_delay=self.max_delay,
             retriable_exceptions=self.retriable_exceptions,
+            strategy=self.strategy,
         )
+
+    def as_async_decorator(self) -> Callable:
+        """Convert policy to a decorator for coroutine functions.
+
+        Returns:
+            Retry decorator that awaits `asyncio.sleep` between attempts
+        """
+        decorator = self.as_decorator()
+
+        def async_decorator(func: Callable) -> Callable:
+            if not asyncio.iscoroutinefunction(func):
+                raise TypeError(f"{func.__name__} is not a coroutine function")
+            wrapped: Callable = decorator(func)
+            return wrapped
+
+        return async_decorator
@@ -1,8 +1,10 @@
 """Security utilities and guardrails for the QA chain."""
 
+import functools
 import os
 import re
-from typing import Optional
+import threading
+from typing import Any, List, Optional
 
 from .config import QAConfig
 from .logging_config import get_logger
@@ -25,10 +27,126 @@ BLOCKED_PATTERNS = [
     r"assistant\s*:\s*",
     r"###\s*(instruction|system)",
 ]
+# All blocked patterns fused into one alternation so input is scanned once; each
+# alternative is a named group so a match can be traced back to its pattern
+_BLOCKED_RE = re.compile(
+    "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(BLOCKED_PATTERNS)),
+    re.IGNORECASE | re.DOTALL,
+)
+
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - optional dependency
+    hyperscan = None  # type: ignore[assignment]
+
+
+def _compile_hyperscan_db() -> Any:
+    """Compile BLOCKED_PATTERNS into a Hyperscan block-mode database, if possible."""
+    if hyperscan is None:
+        return None
+    flags = (
+        hyperscan.HS_FLAG_CASELESS
+        | hyperscan.HS_FLAG_DOTALL
+        | hyperscan.HS_FLAG_SINGLEMATCH
+    )
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[pattern.encode() for pattern in BLOCKED_PATTERNS],
+            ids=list(range(len(BLOCKED_PATTERNS))),
+            elements=len(BLOCKED_PATTERNS),
+            flags=[flags] * len(BLOCKED_PATTERNS),
+        )
+    except hyperscan.error:
+        return None
+    return db
+
+
+# Hyperscan scans every blocked pattern in one DFA pass; when it is not
+# installed (or cannot compile the patterns) _BLOCKED_RE is used instead
+_HS_DB = _compile_hyperscan_db()
+# Hyperscan scratch space must not be shared between concurrent scans
+_hs_local = threading.local()
+
+
+def _hs_on_match(
+    pattern_id: int, start: int, end: int, flags: int, matched: List[int]
+) -> bool:
+    matched.append(pattern_id)
+    return True  # stop scanning at the first match (scan raises ScanTerminated)
+
+
+def _find_blocked_pattern(text: str) -> Optional[str]:
+    """Return the first blocked pattern found in text, or None."""
+    # The Hyperscan database matches bytes, so \s, \w and caseless matching
+    # only cover ASCII there; other text goes through _BLOCKED_RE, whose
+    # Unicode semantics are the reference (e.g. NBSP counts as whitespace)
+    if _HS_DB is not None and text.isascii():
+        scratch = getattr(_hs_local, "scratch", None)
+        if scratch is None:
+            scratch = _hs_local.scratch = hyperscan.Scratch(_HS_DB)
+        matched: List[int] = []
+        try:
+            _HS_DB.scan(
+                text.encode("ascii"),
+                match_event_handler=_hs_on_match,
+                context=matched,
+                scratch=scratch,
+            )
+        except hyperscan.ScanTerminated:
+            pass
+        return BLOCKED_PATTERNS[matched[0]] if matched else None
+
+    match = _BLOCKED_RE.search(text)
+    if match is None:
+        return None
+    return BLOCKED_PATTERNS[int(str(match.lastgroup)[1:])]
+
 
 # API key validation pattern
 API_KEY_PATTERN = re.compile(r"^[a-zA-Z0-9\-_]+$")
 
+# Models a config may select
+ALLOWED_MODELS = frozenset(
+    {
+        "gpt-3.5-turbo",
+        "gpt-3.5-turbo-16k",
+        "gpt-4",
+        "gpt-4-32k",
+        "gpt-4-turbo-preview",
+        "gpt-4o",
+        "gpt-4o-mini",
+    }
+)
+
+# Output sanitization patterns
+SECRET_PATTERNS = [
+    r"sk-[a-zA-Z0-9]{48}",  # OpenAI API key pattern
+    r"[a-f0-9]{32}",  # Generic hex secrets
+    r"(password|token|secret|key)\s*[:=]\s*['\"]?[^'\"]+['\"]?",
+]
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_JAVASCRIPT_URL_RE = re.compile(r"javascript:", re.IGNORECASE)
+_SECRET_RES = [re.compile(pattern, re.IGNORECASE) for pattern in SECRET_PATTERNS]
+# Union of everything sanitize_output rewrites; output that does not match it
+# is returned after a single scan. Dirty output still goes through the passes
+# in order, since one alternation would let the leftmost match win (e.g. a tag
+# splitting a secret) and change what gets removed.
+_UNSAFE_OUTPUT_RE = re.compile(
+    "|".join(
+        [_HTML_TAG_RE.pattern, _JAVASCRIPT_URL_RE.pattern]
+        + [f"(?:{pattern})" for pattern in SECRET_PATTERNS]
+    ),
+    re.IGNORECASE,
+)
+# A secret assignment (last entry of SECRET_PATTERNS) still waiting for its
+# value at the end of the text; more output could complete the match
+_SECRET_ASSIGNMENT_TAIL_RE = re.compile(
+    r"(password|token|secret|key)\s*(?:[:=]\s*['\"]?)?$", re.IGNORECASE
+)
+# Start of the last whitespace run followed by more text
+_LAST_BREAK_RE = re.compile(r"\s+\S*$")
+
 
 class SecurityError(Exception):
     """Raised when a security constraint is violated."""
@@ -38,9 +156,19 @@ class SecurityError(Exception):
 
 def validate_api_keys() -> None:
     """Validate that API keys are properly set and formatted."""
+    _validate_api_key_values(
+        os.getenv("OPENAI_API_KEY"),
+        os.getenv("AZURE_OPENAI_API_KEY"),
+        os.getenv("AZURE_OPENAI_ENDPOINT"),
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _validate_api_key_values(
+    openai_key: Optional[str], azure_key: Optional[str], azure_endpoint: Optional[str]
+) -> None:
+    """Validate API key values; a passing combination is remembered."""
     logger.debug("Validating API keys")
-    openai_key = os.getenv("OPENAI_API_KEY")
-    azure_key = os.getenv("AZURE_OPENAI_API_KEY")
 
     if not openai_key and not azure_key:
         logger.error("No API key found in environment variables")
@@ -52,7 +180,7 @@ def validate_api_keys() -> None:
         if len(openai_key) < 10:
             logger.error("OPENAI_API_KEY appears to be invalid (too short)")
             raise SecurityError("OPENAI_API_KEY appears to be invalid (too short)")
-        if not API_KEY_PATTERN.match(openai_key):
+        if not API_KEY_PATTERN.fullmatch(openai_key):
             logger.error("OPENAI_API_KEY contains invalid characters")
             raise SecurityError("OPENAI_API_KEY contains invalid characters")
         logger.debug("OpenAI API key validation passed")
@@ -65,7 +193,7 @@ def validate_api_keys() -> None:
             raise SecurityError(
                 "AZURE_OPENAI_API_KEY appears to be invalid (too short)"
             )
-        if not os.getenv("AZURE_OPENAI_ENDPOINT"):
+        if not azure_endpoint:
             logger.error("AZURE_OPENAI_ENDPOINT must be set when using Azure OpenAI")
             raise SecurityError(
                 "AZURE_OPENAI_ENDPOINT must be set when using Azure OpenAI"
@@ -84,7 +212,9 @@ def validate_input(question: str, context: str) -> None:
         SecurityError: If inputs violate security constraints
     """
     logger.debug(
-        f"Validating input - question length: {len(question)}, context length: {len(context)}"
+        "Validating input - question length: %d, context length: %d",
+        len(question),
+        len(context),
     )
 
     # Check lengths
@@ -94,7 +224,7 @@ def validate_input(question: str, context: str) -> None:
 
     if len(question) > MAX_QUESTION_LENGTH:
         logger.warning(
-            f"Question validation failed: exceeds {MAX_QUESTION_LENGTH} characters"
+            "Question validation failed: exceeds %d characters", MAX_QUESTION_LENGTH
         )
         raise SecurityError(
             f"Question exceeds maximum length of {MAX_QUESTION_LENGTH} characters"
@@ -102,7 +232,7 @@ def validate_input(question: str, context: str) -> None:
 
     if len(context) > MAX_CONTEXT_LENGTH:
         logger.warning(
-            f"Context validation failed: exceeds {MAX_CONTEXT_LENGTH} characters"
+            "Context validation failed: exceeds %d characters", MAX_CONTEXT_LENGTH
         )
         raise SecurityError(
             f"Context exceeds maximum length of {MAX_CONTEXT_LENGTH} characters"
@@ -110,13 +240,14 @@ def validate_input(question: str, context: str) -> None:
 
     # Check for blocked patterns
     logger.debug("Checking for blocked patterns")
-    combined_input = f"{question} {context}".lower()
-    for pattern in BLOCKED_PATTERNS:
-        if re.search(pattern, combined_input, re.IGNORECASE | re.DOTALL):
-            logger.warning(
-                f"Input validation failed: blocked pattern detected - {pattern}"
-            )
-            raise SecurityError("Input contains blocked content patterns")
+    # Question and context are scanned separately rather than joined into a
+    # copy; no blocked pattern is meant to span the boundary between them
+    pattern = _find_blocked_pattern(question) or _find_blocked_pattern(context)
+    if pattern:
+        logger.warning(
+            "Input validation failed: blocked pattern detected - %s", pattern
+        )
+        raise SecurityError("Input contains blocked content patterns")
 
     logger.debug("Input validation passed")
 
@@ -131,40 +262,57 @@ def validate_config(config: QAConfig) -> None:
         SecurityError: If configuration violates security constraints
     """
     logger.debug(
-        f"Validating config - model: {config.model}, temperature: {config.temperature}"
+        "Validating config - model: %s, temperature: %s",
+        config.model,
+        config.temperature,
     )
 
     # Temperature validation
     if not 0 <= config.temperature <= 1:
-        logger.error(f"Invalid temperature: {config.temperature}")
+        logger.error("Invalid temperature: %s", config.temperature)
         raise SecurityError("Temperature must be between 0 and 1")
 
     # Model validation - ensure only allowed models
-    allowed_models = {
-        "gpt-3.5-turbo",
-        "gpt-3.5-turbo-16k",
-        "gpt-4",
-        "gpt-4-32k",
-        "gpt-4-turbo-preview",
-        "gpt-4o",
-        "gpt-4o-mini",
-    }
-
-    if config.model not in allowed_models:
-        logger.error(f"Model '{config.model}' is not in allowed list")
+    if config.model not in ALLOWED_MODELS:
+        logger.error("Model '%s' is not in allowed list", config.model)
         raise SecurityError(f"Model '{config.model}' is not in allowed list")
 
     # Max context chars validation
     if config.max_context_chars < 100:
-        logger.error(f"max_context_chars too small: {config.max_context_chars}")
+        logger.error("max_context_chars too small: %d", config.max_context_chars)
         raise SecurityError("max_context_chars must be at least 100")
     if config.max_context_chars > MAX_CONTEXT_LENGTH:
-        logger.error(f"max_context_chars too large: {config.max_context_chars}")
+        logger.error("max_context_chars too large: %d", config.max_context_chars)
         raise SecurityError(f"max_context_chars cannot exceed {MAX_CONTEXT_LENGTH}")
 
     logger.debug("Config validation passed")
 
 
+def _sanitize_passes(output: str, log: bool = True) -> str:
+    """Apply the sanitize_output rewrites, leaving surrounding whitespace."""
+    # Fast path: nothing any pass below would rewrite
+    if not _UNSAFE_OUTPUT_RE.search(output):
+        return output
+
+    # Tags go first, so a secret or URL split by one is caught once joined
+    output, count = _HTML_TAG_RE.subn("", output)
+    if count and log:
+        logger.warning("Removed HTML tags from output")
+
+    output, count = _JAVASCRIPT_URL_RE.subn("", output)
+    if count and log:
+        logger.warning("Removed JavaScript URLs from output")
+
+    secrets_found = False
+    for pattern in _SECRET_RES:
+        output, count = pattern.subn("[REDACTED]", output)
+        secrets_found = secrets_found or count > 0
+    if secrets_found and log:
+        logger.warning("Redacted potential secrets from output")
+
+    return output
+
+
 def sanitize_output(output: str) -> str:
     """Sanitize model output to remove potential security issues.
 
@@ -174,40 +322,94 @@ def sanitize_output(output: str) -> str:
     Returns:
         Sanitized output string
     """
-    logger.debug(f"Sanitizing output of length {len(output)}")
-    original_output = output
-
-    # Remove any HTML/script tags that might have been generated
-    output = re.sub(r"<[^>]+>", "", output)
-    if output != original_output:
-        logger.warning("Removed HTML tags from output")
-
-    # Remove potential JavaScript
-    temp_output = re.sub(r"javascript:", "", output, flags=re.IGNORECASE)
-    if temp_output != output:
-        logger.warning("Removed JavaScript URLs from output")
-        output = temp_output
+    logger.debug("Sanitizing output of length %d", len(output))
+    output = _sanitize_passes(output).strip()
+    logger.debug("Output sanitized - final length: %d", len(output))
+    return output
 
-    # Ensure output doesn't contain API keys or secrets
-    # Simple check for common secret patterns
-    secret_patterns = [
-        r"sk-[a-zA-Z0-9]{48}",  # OpenAI API key pattern
-        r"[a-f0-9]{32}",  # Generic hex secrets
-        r"(password|token|secret|key)\s*[:=]\s*['\"]?[^'\"]+['\"]?",
-    ]
 
-    secrets_found = False
-    for pattern in secret_patterns:
-        temp_output = re.sub(pattern, "[REDACTED]", output, flags=re.IGNORECASE)
-        if temp_output != output:
-            secrets_found = True
-            output = temp_output
+class OutputStreamSanitizer:
+    """Sanitize model output that arrives in chunks.
 
-    if secrets_found:
-        logger.warning("Redacted potential secrets from output")
+    `feed` returns the sanitized text that is safe to show so far and holds
+    back anything a pattern could still match once more output arrives: an
+    unclosed tag, the last word, and a secret assignment awaiting its value.
+    `close` returns the rest. Joined, the returned pieces equal
+    `sanitize_output` of the whole output.
+    """
 
-    logger.debug(f"Output sanitized - final length: {len(output.strip())}")
-    return output.strip()
+    def __init__(self) -> None:
+        """Initialize an empty stream."""
+        self._pending = ""
+        self._space = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of raw output.
+
+        Args:
+            chunk: Next piece of model output
+
+        Returns:
+            Sanitized text that is now final (possibly empty)
+        """
+        self._pending += chunk
+        cut = self._safe_cut()
+        if not cut:
+            return ""
+        head, self._pending = self._pending[:cut], self._pending[cut:]
+        return self._emit(_sanitize_passes(head))
+
+    def close(self) -> str:
+        """End the stream.
+
+        Returns:
+            Sanitized text still held back, without trailing whitespace
+        """
+        text = self._emit(_sanitize_passes(self._pending))
+        self._pending = ""
+        self._space = ""
+        return text
+
+    def _safe_cut(self) -> int:
+        """Return where the pending text can be split without changing matches.
+
+        Cuts fall at the start of a whitespace run, which none of the tag, URL
+        or key patterns can span, and before any unclosed tag.
+        """
+        text = self._pending
+        unclosed = text.find("<", text.rfind(">") + 1)
+        region = text if unclosed == -1 else text[:unclosed]
+        match = _LAST_BREAK_RE.search(region.rstrip())
+        if match is None or match.start() == 0:
+            return 0
+        cut = match.start()
+        head, tail = text[:cut], text[cut:]
+        # A secret assignment can span whitespace, and removing a tag or URL
+        # after the cut can bring its ":" next to it; don't split one that is
+        # still waiting for a value, or one the split would change
+        if _SECRET_ASSIGNMENT_TAIL_RE.search(
+            _JAVASCRIPT_URL_RE.sub("", _HTML_TAG_RE.sub("", head))
+        ):
+            return 0
+        if _sanitize_passes(head, log=False) + _sanitize_passes(
+            tail, log=False
+        ) != _sanitize_passes(text, log=False):
+            return 0
+        return cut
+
+    def _emit(self, text: str) -> str:
+        # Strip leading whitespace of the output and hold trailing whitespace
+        # until more text follows, as sanitize_output strips the whole answer
+        if not self._started:
+            text = text.lstrip()
+        body = text.rstrip()
+        if not body:
+            self._space += text
+            return ""
+        self._started = True
+        text, self._space = self._space + body, text[len(body) :]
+        return text
 
 
 def get_secure_env_var(key: str, default: Optional[str] = None) -> Optional[str]:
@@ -221,8 +423,12 @@ def get_secure_env_var(key: str, default: Optional[str] = None) -> Optional[str]
         The environment variable value or default
     """
     value = os.getenv(key, default)
-    if value and key.endswith("_KEY"):
-        # Basic validation for API keys
-        if len(value) < 10 or not API_KEY_PATTERN.match(value):
-            return None
+    if value and key.endswith("_KEY") and not _is_valid_api_key_format(value):
+        return None
     return value
+
+
+@functools.lru_cache(maxsize=32)
+def _is_valid_api_key_format(value: str) -> bool:
+    """Basic validation for API keys; results are remembered per value."""
+    return len(value) >= 10 and API_KEY_PATTERN.fullmatch(value) is not None
@@ -0,0 +1,97 @@
+"""Shared pytest fixtures."""
+
+import logging
+
+import pytest
+
+from qa_chain import QAConfig
+from qa_chain.prompts import NO_ANSWER
+
+
+@pytest.fixture(scope="session")
+def qa_config() -> QAConfig:
+    """Deterministic config shared by the whole session.
+
+    QAConfig is frozen, so tests can share one validated instance; derive
+    variants with `model_copy(update=...)`.
+    """
+    return QAConfig(temperature=0.0)
+
+
+@pytest.fixture(autouse=True)
+def _retries_resumed():
+    """Clear a retry interrupt left behind by an earlier test.
+
+    `interrupt_retries` is sticky and process-wide (the API lifespan calls it
+    on shutdown), so without this retry tests would depend on test order.
+    """
+    from qa_chain.retry import resume_retries
+
+    resume_retries()
+
+
+@pytest.fixture
+def isolated_root_logger():
+    """Undo a test's `setup_logging` call so later tests see the prior config.
+
+    File handlers the test installed on the root logger are closed and
+    removed, and the root level and configured flag are restored. Tests
+    must not depend on the order they run in (e.g. under pytest-xdist).
+    """
+    from qa_chain import logging_config
+
+    root = logging.getLogger()
+    level = root.level
+    configured = logging_config._logging_configured
+    yield
+    for handler in root.handlers[:]:
+        if isinstance(handler, logging.FileHandler):
+            root.removeHandler(handler)
+            handler.close()
+    root.setLevel(level)
+    logging_config._logging_configured = configured
+
+
+@pytest.fixture
+def tight_rate_limit(monkeypatch):
+    """Swap in a global rate limiter allowing one request per minute.
+
+    The original limiter is restored by monkeypatch after the test.
+    """
+    from qa_chain.rate_limiter import RateLimiter
+
+    monkeypatch.setattr(
+        "qa_chain.rate_limiter._global_rate_limiter",
+        RateLimiter(max_requests=1, window_seconds=60),
+    )
+
+
+class FakeLLM:
+    """LLM stand-in that records each rendered prompt and returns `answer`."""
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self.answer = NO_ANSWER
+
+    def __call__(self, prompt_value) -> str:
+        self.prompts.append(prompt_value.to_string())
+        return self.answer
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Run the real pipeline with the OpenAI call replaced by a `FakeLLM`."""
+    from langchain_core.runnables import RunnableLambda
+
+    from qa_chain import chain
+    from qa_chain.cache import get_response_cache
+
+    fake = FakeLLM()
+    monkeypatch.setattr(
+        chain, "_get_llm", lambda model, temperature: RunnableLambda(fake)
+    )
+    chain._chain_for.cache_clear()
+    get_response_cache().clear()
+    yield fake
+    chain._chain_for.cache_clear()
+    get_response_cache().clear()
@@ -1,20 +1,22 @@
 """Test the FastAPI server."""
 
-import sys
-from pathlib import Path
+import json
 
 import pytest
 from fastapi.testclient import TestClient
 
-# Add examples to path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "examples"))
-
+# examples/ is on sys.path via [tool.pytest.ini_options] in pyproject.toml
 from api_server import app
+from qa_chain.config import DEFAULT_CONFIG
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    """Create a test client."""
+    """Create a test client shared by the tests in this module.
+
+    Tests patch module attributes with the function-scoped ``monkeypatch``
+    fixture, which is undone after each test while the client is reused.
+    """
     return TestClient(app)
 
 
@@ -118,13 +120,13 @@ def test_answer_security_error(client, monkeypatch):
     """Test answer endpoint security errors."""
 
     # Mock to force security error
-    def mock_answer(*args, **kwargs):
+    async def mock_answer(*args, **kwargs):
         from qa_chain import SecurityError
 
         raise SecurityError("Input contains blocked content patterns")
 
     # Patch the import in api_server module
-    monkeypatch.setattr("api_server.answer_question", mock_answer)
+    monkeypatch.setattr("api_server.answer_question_async", mock_answer)
 
     response = client.post(
         "/answer",
@@ -140,13 +142,13 @@ def test_answer_rate_limit_error(client, monkeypatch):
     """Test answer endpoint rate limit errors."""
 
     # Mock to force rate limit error
-    def mock_answer(*args, **kwargs):
+    async def mock_answer(*args, **kwargs):
         from qa_chain import SecurityError
 
         raise SecurityError("Rate limit exceeded")
 
     # Patch the import in api_server module
-    monkeypatch.setattr("api_server.answer_question", mock_answer)
+    monkeypatch.setattr("api_server.answer_question_async", mock_answer)
 
     response = client.post(
         "/answer",
@@ -156,3 +158,139 @@ def test_answer_rate_limit_error(client, monkeypatch):
         },
     )
     assert response.status_code == 429
+
+
+def test_answer_stream(client, monkeypatch):
+    """Test streaming endpoint emits sanitized deltas, the answer and DONE."""
+
+    async def mock_stream(*args, **kwargs):
+        for chunk in ["Paris is <b", "> it. Key", ": sk-abc", "\ndone"]:
+            yield chunk
+
+    monkeypatch.setattr("api_server.astream_answer", mock_stream)
+
+    response = client.post(
+        "/answer/stream",
+        json={"question": "What is the capital?", "context": "Paris is it."},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [
+        line[len("data: ") :]
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert events[-1] == "[DONE]"
+    payloads = [json.loads(event) for event in events[:-1]]
+    deltas = [p["delta"] for p in payloads[:-1]]
+    assert deltas == ["Paris", " is  it.", " [REDACTED]"]
+    # Patterns split across chunks never reach the client unsanitized
+    assert payloads[-1] == {"answer": "".join(deltas)}
+
+
+def test_answer_stream_security_error(client, monkeypatch):
+    """Test streaming endpoint maps errors raised before streaming to HTTP codes."""
+
+    async def mock_stream(*args, **kwargs):
+        from qa_chain import SecurityError
+
+        raise SecurityError("Rate limit exceeded")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr("api_server.astream_answer", mock_stream)
+
+    response = client.post(
+        "/answer/stream",
+        json={"question": "What is X?", "context": "X is Y."},
+    )
+    assert response.status_code == 429
+
+
+def test_answer_rejects_unknown_fields(client):
+    """Test answer endpoint rejects fields outside the request schema."""
+    response = client.post(
+        "/answer",
+        json={"question": "Question?", "context": "Context", "unexpected": True},
+    )
+    assert response.status_code == 422
+
+
+def test_startup_warms_up_llm_client(monkeypatch):
+    """Test the LLM client is warmed up at startup when an API key is set."""
+    calls = []
+
+    async def mock_warm_up(config=DEFAULT_CONFIG):
+        calls.append(config.model)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test123")
+    monkeypatch.setattr("api_server.awarm_up", mock_warm_up)
+
+    with TestClient(app):
+        pass
+    assert calls == ["gpt-4o-mini"]
+
+
+def test_startup_resumes_interrupted_retries(monkeypatch):
+    """Test a restart in the same process clears the shutdown retry interrupt."""
+    from qa_chain import retry
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("AZURE_OPENAI_API_KEY", raising=False)
+    retry.interrupt_retries()
+
+    with TestClient(app):
+        assert not retry._shutdown.is_set()
+    assert retry._shutdown.is_set()
+
+
+def test_startup_skips_warm_up_without_api_key(monkeypatch):
+    """Test no warm-up request is attempted without an API key."""
+    calls = []
+
+    async def mock_warm_up(config=DEFAULT_CONFIG):
+        calls.append(config)
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("AZURE_OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr("api_server.awarm_up", mock_warm_up)
+
+    with TestClient(app):
+        pass
+    assert calls == []
+
+
+def test_rate_limit_middleware_rejects_before_parsing(client, monkeypatch):
+    """Test over-limit clients get 429 before their body is validated."""
+    from qa_chain.rate_limiter import RateLimiter
+
+    configs = []
+
+    async def mock_answer(question, context, config):
+        configs.append(config)
+        return "Answer"
+
+    monkeypatch.setattr("api_server._rate_limiter", RateLimiter(max_requests=1))
+    monkeypatch.setattr("api_server.answer_question_async", mock_answer)
+
+    response = client.post("/answer", json={"question": "Q?", "context": "Context"})
+    assert response.status_code == 200
+    # The global limit still applies on top of the per-client one
+    assert configs[0].enable_rate_limiting is True
+
+    # Invalid body would be a 422, but the limit is checked first
+    response = client.post("/answer", json={"unexpected": True})
+    assert response.status_code == 429
+    assert response.json()["error_type"] == "rate_limit"
+    assert "Retry-After" in response.headers
+
+    # Unvalidated credentials don't buy a fresh limit
+    response = client.post(
+        "/answer",
+        json={"question": "Q?", "context": "Context"},
+        headers={"Authorization": "Bearer other"},
+    )
+    assert response.status_code == 429
+
+    # Other paths are unaffected
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,130 @@
+"""Test adaptive concurrency control."""
+
+import asyncio
+from types import SimpleNamespace
+
+from qa_chain.backpressure import (
+    AIMDController,
+    RateLimitHeaderHandler,
+    _parse_duration,
+)
+
+
+def test_additive_increase_multiplicative_decrease():
+    """Successes grow the limit slowly; throttles halve it."""
+    controller = AIMDController(initial_concurrency=4, max_concurrency=5)
+
+    controller.on_success()
+    controller.on_success()
+    assert controller.concurrency == 5
+
+    controller.on_success()
+    assert controller.concurrency == 5
+
+    controller.on_throttle()
+    assert controller.limit == 2
+
+    controller.on_throttle()
+    controller.on_throttle()
+    assert controller.limit == 1
+
+
+def test_headers_pause_requests():
+    """retry-after and an exhausted request budget pause new requests."""
+    controller = AIMDController(initial_concurrency=4)
+
+    controller.on_success(
+        {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"}
+    )
+    assert controller.concurrency == 4
+    assert controller.paused_until > 0
+
+    error = Exception("Too many requests")
+    error.response = SimpleNamespace(  # type: ignore[attr-defined]
+        status_code=429, headers={"retry-after": "1"}
+    )
+    controller.on_error(error)
+    assert controller.concurrency == 2
+
+
+def test_non_throttle_errors_are_ignored():
+    """Errors without a 429/5xx status do not change the limit."""
+    controller = AIMDController(initial_concurrency=4)
+    controller.on_error(ValueError("bad input"))
+    assert controller.concurrency == 4
+
+
+def test_parse_duration():
+    """Header durations are parsed into seconds."""
+    assert _parse_duration("1.5") == 1.5
+    assert _parse_duration("6m0s") == 360
+    assert _parse_duration("20ms") == 0.02
+    assert _parse_duration("soon") is None
+    assert _parse_duration(None) is None
+
+
+def test_slot_limits_concurrency():
+    """No more than `limit` requests run at once."""
+    controller = AIMDController(initial_concurrency=2)
+    active = []
+    peak = []
+
+    async def worker():
+        async with controller.slot():
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(6)))
+
+    asyncio.run(main())
+    assert max(peak) == 2
+    assert controller.in_flight == 0
+
+
+def test_handler_reads_response_headers():
+    """The callback handler forwards response headers to the controller."""
+    controller = AIMDController(initial_concurrency=4)
+    handler = RateLimitHeaderHandler(controller)
+    message = SimpleNamespace(response_metadata={"headers": {"retry-after": "3"}})
+    response = SimpleNamespace(generations=[[SimpleNamespace(message=message)]])
+
+    handler.on_llm_end(response)
+
+    assert controller.concurrency == 4.5
+    assert controller.paused_until > 0
+
+
+def test_cancelled_waiter_passes_on_its_wake_up():
+    """A waiter cancelled right after being woken hands the slot to the next."""
+    controller = AIMDController(initial_concurrency=1)
+
+    async def main():
+        await controller._acquire()
+        woken = asyncio.create_task(controller._acquire())
+        next_in_line = asyncio.create_task(controller._acquire())
+        await asyncio.sleep(0)
+
+        controller._release()
+        woken.cancel()
+        await asyncio.wait_for(next_in_line, timeout=1)
+        assert woken.cancelled()
+
+    asyncio.run(main())
+    assert controller.in_flight == 1
+
+
+def test_each_event_loop_gets_its_own_controller():
+    """Controllers are not shared across event loops."""
+    from qa_chain.backpressure import get_aimd_controller
+
+    async def current():
+        assert get_aimd_controller() is get_aimd_controller()
+        return get_aimd_controller()
+
+    first = asyncio.run(current())
+    second = asyncio.run(current())
+    assert first is not second
+    assert get_aimd_controller() not in (first, second)
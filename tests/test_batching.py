@@ -0,0 +1,106 @@
+"""Tests for micro-batching of async requests."""
+
+import asyncio
+
+import pytest
+
+from qa_chain import QAConfig
+from qa_chain.backpressure import get_aimd_controller
+from qa_chain.batching import BatchedAnswerer
+
+
+class FakeBatchChain:
+    """Chain stub that records each abatch call."""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.configs = []
+        self.in_flight = []
+        self.error = error
+
+    async def abatch(self, inputs, config=None, return_exceptions=False):
+        self.batches.append(inputs)
+        self.configs.append(config)
+        self.in_flight.append(get_aimd_controller().in_flight)
+        if self.error is not None:
+            return [self.error for _ in inputs]
+        return [f"answer: {item['question']}" for item in inputs]
+
+
+@pytest.fixture
+def fake_chain(monkeypatch):
+    from qa_chain import chain
+
+    fake = FakeBatchChain()
+    monkeypatch.setattr(chain, "build_chain", lambda config: fake)
+    return fake
+
+
+# QAConfig is frozen, so every batched request can share one instance
+CONFIG = QAConfig(enable_cache=False, enable_rate_limiting=False)
+
+
+def _answer_all(batcher, requests):
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(batcher.answer(q, c, CONFIG) for q, c in requests),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_requests_share_one_batch(fake_chain):
+    batcher = BatchedAnswerer(max_batch_size=8, max_wait_ms=50)
+    answers = _answer_all(batcher, [(f"Q{i}?", "Some context.") for i in range(3)])
+
+    assert answers == ["answer: Q0?", "answer: Q1?", "answer: Q2?"]
+    assert len(fake_chain.batches) == 1
+    assert len(fake_chain.batches[0]) == 3
+
+
+def test_batches_respect_max_size(fake_chain):
+    batcher = BatchedAnswerer(max_batch_size=2, max_wait_ms=50)
+    _answer_all(batcher, [(f"Q{i}?", "Some context.") for i in range(5)])
+
+    assert [len(batch) for batch in fake_chain.batches] == [2, 2, 1]
+
+
+def test_contexts_are_bucketed_by_length(fake_chain):
+    batcher = BatchedAnswerer(max_batch_size=8, max_wait_ms=50)
+    _answer_all(batcher, [("Short?", "Tiny context."), ("Long?", "Word " * 400)])
+
+    assert len(fake_chain.batches) == 2
+
+
+def test_non_retriable_errors_reach_the_caller(fake_chain):
+    fake_chain.error = ValueError("bad request")
+    batcher = BatchedAnswerer(max_wait_ms=10)
+    (result,) = _answer_all(batcher, [("Q?", "Some context.")])
+
+    assert isinstance(result, ValueError)
+
+
+def test_batches_hold_an_adaptive_concurrency_slot(fake_chain):
+    batcher = BatchedAnswerer(max_wait_ms=10)
+    _answer_all(batcher, [("Q?", "Some context.")])
+
+    assert fake_chain.in_flight == [1]
+    assert fake_chain.configs[0]["max_concurrency"] >= 1
+
+
+def test_stop_fails_requests_still_waiting(fake_chain):
+    batcher = BatchedAnswerer(max_wait_ms=10_000)
+
+    async def run():
+        pending = asyncio.ensure_future(batcher.answer("Q?", "Some context.", CONFIG))
+        await asyncio.sleep(0.01)
+        await batcher.stop()
+        return await asyncio.wait_for(pending, 1)
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        asyncio.run(run())
+    assert fake_chain.batches == []
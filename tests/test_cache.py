@@ -0,0 +1,188 @@
+"""Tests for the response cache."""
+
+from unittest.mock import patch
+
+from qa_chain.cache import ResponseCache, SemanticCache, make_cache_key
+
+
+class TestResponseCache:
+    """Test ResponseCache behavior."""
+
+    def test_get_missing_returns_none(self):
+        cache = ResponseCache()
+        assert cache.get("missing") is None
+
+    def test_set_and_get(self):
+        cache = ResponseCache()
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        assert len(cache) == 1
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_size=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache(ttl_seconds=10)
+        with patch("qa_chain.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        with patch("qa_chain.cache.time.monotonic", return_value=111.0):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_clear(self):
+        cache = ResponseCache()
+        cache.set("key", "value")
+        cache.clear()
+        assert len(cache) == 0
+
+
+def test_cache_key_depends_on_all_fields():
+    base = make_cache_key("gpt-4o-mini", 0.0, "q", "c")
+    assert base == make_cache_key("gpt-4o-mini", 0.0, "q", "c")
+    assert base != make_cache_key("gpt-4o", 0.0, "q", "c")
+    assert base != make_cache_key("gpt-4o-mini", 0.2, "q", "c")
+    assert base != make_cache_key("gpt-4o-mini", 0.0, "q2", "c")
+    assert base != make_cache_key("gpt-4o-mini", 0.0, "q", "c2")
+
+
+def _letter_embedding(text):
+    """Tiny deterministic embedder: letter frequency vector."""
+    text = text.lower()
+    return [text.count(ch) for ch in "abcdefghijklmnopqrstuvwxyz"]
+
+
+class TestSemanticCache:
+    """Test SemanticCache behavior."""
+
+    def test_similar_question_hits(self):
+        cache = SemanticCache(threshold=0.9, embed=_letter_embedding)
+        cache.set("What is the capital of France?", "ctx", "Paris")
+        assert cache.get("what is the capital of france", "ctx") == "Paris"
+
+    def test_dissimilar_question_misses(self):
+        cache = SemanticCache(threshold=0.99, embed=_letter_embedding)
+        cache.set("What is the capital of France?", "ctx", "Paris")
+        assert cache.get("Who won?", "ctx") is None
+
+    def test_context_must_match(self):
+        cache = SemanticCache(threshold=0.9, embed=_letter_embedding)
+        cache.set("What is the capital of France?", "ctx", "Paris")
+        assert cache.get("What is the capital of France?", "other") is None
+
+    def test_expired_entries_are_dropped(self):
+        cache = SemanticCache(ttl_seconds=10, embed=_letter_embedding)
+        with patch("qa_chain.cache.time.monotonic", return_value=100.0):
+            cache.set("Question?", "ctx", "Answer")
+        with patch("qa_chain.cache.time.monotonic", return_value=111.0):
+            assert cache.get("Question?", "ctx") is None
+        # A context with nothing left in it is dropped entirely
+        assert "ctx" not in cache.entries
+
+    def test_entries_per_context_are_bounded(self):
+        cache = SemanticCache(max_entries_per_context=2, embed=_letter_embedding)
+        for question in ["aaa", "bbb", "ccc"]:
+            cache.set(question, "ctx", question)
+        assert cache.get("aaa", "ctx") is None
+        assert cache.get("ccc", "ctx") == "ccc"
+
+    def test_contexts_are_bounded(self):
+        cache = SemanticCache(max_contexts=2, embed=_letter_embedding)
+        cache.set("aaa", "ctx1", "1")
+        cache.set("aaa", "ctx2", "2")
+        cache.get("aaa", "ctx1")  # "ctx2" is now least recently used
+        cache.set("aaa", "ctx3", "3")
+        assert list(cache.entries) == ["ctx1", "ctx3"]
+
+    def test_miss_then_set_embeds_once(self):
+        embedded = []
+
+        def embed(text):
+            embedded.append(text)
+            return _letter_embedding(text)
+
+        cache = SemanticCache(threshold=0.99, embed=embed)
+        cache.set("Who won?", "ctx", "Nobody")
+        assert cache.get("What is the capital of France?", "ctx") is None
+        cache.set("What is the capital of France?", "ctx", "Paris")
+        assert embedded == ["Who won?", "What is the capital of France?"]
+
+
+def test_semantic_tier_requires_zero_temperature(monkeypatch):
+    from qa_chain import QAConfig, answer_question, chain
+    from qa_chain.cache import (
+        configure_semantic_cache,
+        get_response_cache,
+        get_semantic_cache,
+    )
+
+    configure_semantic_cache(threshold=0.9, embed=_letter_embedding)
+    get_response_cache().clear()
+    calls = []
+
+    def fake_invoke(_chain, question, context, config):
+        calls.append(question)
+        return "Paris"
+
+    monkeypatch.setattr(chain, "build_chain", lambda config: None)
+    monkeypatch.setattr(chain, "_invoke_chain_with_retry", fake_invoke)
+    context = "Paris is the capital of France."
+
+    cfg = QAConfig(temperature=0.0, enable_semantic_cache=True)
+    answer_question("What is the capital of France?", context, cfg)
+    assert answer_question("what is the capital of france", context, cfg) == "Paris"
+    assert len(calls) == 1
+
+    warm = QAConfig(temperature=0.2, enable_semantic_cache=True)
+    answer_question("what is the capital of France??", context, warm)
+    assert len(calls) == 2
+
+    get_response_cache().clear()
+    get_semantic_cache().clear()
+
+
+def test_async_semantic_tier_embeds_off_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+
+    from qa_chain import QAConfig, answer_question_async, chain
+    from qa_chain.cache import (
+        configure_semantic_cache,
+        get_response_cache,
+        get_semantic_cache,
+    )
+
+    threads = []
+
+    def embed(text):
+        threads.append(threading.current_thread())
+        return _letter_embedding(text)
+
+    async def fake_ainvoke(_chain, question, context, config):
+        return "Paris"
+
+    configure_semantic_cache(threshold=0.9, embed=embed)
+    get_response_cache().clear()
+    monkeypatch.setattr(chain, "build_chain", lambda config: None)
+    monkeypatch.setattr(chain, "_ainvoke_chain_with_retry", fake_ainvoke)
+    cfg = QAConfig(temperature=0.0, enable_semantic_cache=True)
+    context = "Paris is the capital of France."
+
+    async def run():
+        first = await answer_question_async("What is the capital?", context, cfg)
+        second = await answer_question_async("what is the capital", context, cfg)
+        return first, second
+
+    assert asyncio.run(run()) == ("Paris", "Paris")
+    assert threads
+    assert threading.main_thread() not in threads
+
+    get_response_cache().clear()
+    get_semantic_cache().clear()
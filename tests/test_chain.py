@@ -1,17 +1,302 @@
+import logging
 import os
 
 import pytest
 from dotenv import load_dotenv
 
 from qa_chain import QAConfig, answer_question
+from qa_chain.config import DEFAULT_CONFIG
 
 # Load environment variables from .env file
 load_dotenv()
 
 
 @pytest.mark.skipif("OPENAI_API_KEY" not in os.environ, reason="needs OPENAI_API_KEY")
-def test_answer_question_smoke():
+def test_answer_question_smoke(qa_config):
     context = "Paris is the capital of France."
     q = "What is the capital of France?"
-    a = answer_question(q, context, QAConfig(temperature=0.0))
+    a = answer_question(q, context, qa_config)
     assert "Paris" in a
+
+
+def test_llm_client_is_cached_and_pooled(monkeypatch):
+    """ChatOpenAI instances are reused and share one HTTP connection pool."""
+    from qa_chain import chain
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test1234567890")
+    chain._get_llm.cache_clear()
+
+    llm = chain._get_llm("gpt-4o-mini", 0.0)
+    assert chain._get_llm("gpt-4o-mini", 0.0) is llm
+    assert chain._get_llm("gpt-4o-mini", 0.5) is not llm
+    assert llm.http_client is chain._HTTP_CLIENT
+    assert llm.http_async_client is chain._AHTTP_CLIENT
+
+    chain._get_llm.cache_clear()
+
+
+def test_ainvoke_chain_with_retry(monkeypatch):
+    """The async path retries transient failures without blocking the loop."""
+    import asyncio
+
+    from qa_chain import chain
+
+    class FlakyChain:
+        calls = 0
+
+        async def ainvoke(self, inputs):
+            FlakyChain.calls += 1
+            if FlakyChain.calls == 1:
+                raise ConnectionError("Temporary failure")
+            return f"answer to {inputs['question']}"
+
+    async def no_sleep(delay):
+        return None
+
+    monkeypatch.setattr("qa_chain.retry.asyncio.sleep", no_sleep)
+    result = asyncio.run(
+        chain._ainvoke_chain_with_retry(FlakyChain(), "Q?", "ctx", DEFAULT_CONFIG)
+    )
+    assert result == "answer to Q?"
+    assert FlakyChain.calls == 2
+
+
+def test_repeated_question_is_served_from_cache(monkeypatch):
+    """A second identical request does not invoke the LLM chain again."""
+    from qa_chain import chain
+    from qa_chain.cache import get_response_cache
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test1234567890")
+    get_response_cache().clear()
+    chain._get_llm.cache_clear()
+    chain._chain_for.cache_clear()
+    calls = []
+
+    def fake_invoke(_chain, question, context, config):
+        calls.append(question)
+        return "Paris"
+
+    monkeypatch.setattr(chain, "_invoke_chain_with_retry", fake_invoke)
+    cfg = QAConfig(temperature=0.0, enable_rate_limiting=False)
+
+    assert answer_question("Capital?", "Paris is the capital.", cfg) == "Paris"
+    assert answer_question("Capital?", "Paris is the capital.", cfg) == "Paris"
+    assert len(calls) == 1
+
+    uncached = QAConfig(temperature=0.0, enable_rate_limiting=False, enable_cache=False)
+    answer_question("Capital?", "Paris is the capital.", uncached)
+    assert len(calls) == 2
+
+    get_response_cache().clear()
+    chain._get_llm.cache_clear()
+    chain._chain_for.cache_clear()
+
+
+def test_logging_is_configured_once(monkeypatch):
+    """Requests only adjust the log level once logging has been set up."""
+    from qa_chain import chain
+
+    calls = []
+    monkeypatch.setattr(chain, "is_logging_configured", lambda: bool(calls))
+    monkeypatch.setattr(chain, "setup_logging", lambda *args: calls.append(args))
+    root_level = logging.getLogger().level
+
+    cfg = QAConfig(log_level="WARNING")
+    chain._setup_request_logging(cfg)
+    chain._setup_request_logging(cfg)
+    assert calls == [("WARNING", "json", None, 0)]
+    assert logging.getLogger().level == logging.WARNING
+
+    chain._setup_request_logging(QAConfig(enable_debug_mode=True))
+    assert len(calls) == 1
+    assert logging.getLogger().level == logging.DEBUG
+
+    logging.getLogger().setLevel(root_level)
+
+
+def test_chain_and_retry_policy_are_reused(monkeypatch):
+    """Requests with the same settings share one pipeline and retry wrapper."""
+    from qa_chain import chain
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test1234567890")
+    chain._get_llm.cache_clear()
+    chain._chain_for.cache_clear()
+
+    cfg = QAConfig(temperature=0.0)
+    assert chain.build_chain(cfg) is chain.build_chain(QAConfig(temperature=0.0))
+    # Clipping happens before the pipeline, so it doesn't split the cache
+    assert chain.build_chain(cfg) is chain.build_chain(
+        QAConfig(temperature=0.0, max_context_chars=1000)
+    )
+    assert chain.build_chain(cfg) is not chain.build_chain(QAConfig(temperature=0.5))
+
+    policy = chain._retry_policy(cfg)
+    assert chain._retry_policy(QAConfig()) is policy
+    assert chain._retrying_invoker(policy) is chain._retrying_invoker(policy)
+
+    chain._get_llm.cache_clear()
+    chain._chain_for.cache_clear()
+
+
+def test_short_context_is_answered_without_llm(monkeypatch):
+    """Requests whose context is too short never reach the LLM."""
+    from qa_chain import chain
+    from qa_chain.prompts import NO_ANSWER
+
+    def fail_build(config):
+        raise AssertionError("LLM chain should not be built")
+
+    monkeypatch.setattr(chain, "build_chain", fail_build)
+    before = chain.get_short_circuit_stats().get("short_context", 0)
+
+    assert answer_question("What is this?", "   tiny  ", DEFAULT_CONFIG) == NO_ANSWER
+    assert chain.get_short_circuit_stats()["short_context"] == before + 1
+
+
+def test_astream_answer_streams_and_caches(monkeypatch):
+    """Streamed chunks are yielded as they arrive; the joined answer is cached."""
+    import asyncio
+
+    from qa_chain import astream_answer, chain
+    from qa_chain.backpressure import get_aimd_controller
+    from qa_chain.cache import get_response_cache
+
+    class StreamingChain:
+        async def astream(self, inputs):
+            # The stream holds an adaptive concurrency slot while it runs
+            assert get_aimd_controller().in_flight == 1
+            for chunk in ["Par", "is"]:
+                yield chunk
+
+    monkeypatch.setattr(chain, "build_chain", lambda config: StreamingChain())
+    get_response_cache().clear()
+    cfg = QAConfig(temperature=0.0, enable_rate_limiting=False)
+
+    async def collect():
+        return [c async for c in astream_answer("Capital?", "Paris is it.", cfg)]
+
+    assert asyncio.run(collect()) == ["Par", "is"]
+    assert get_aimd_controller().in_flight == 0
+    # Second request is served whole from the cache
+    assert asyncio.run(collect()) == ["Paris"]
+
+    get_response_cache().clear()
+
+
+def test_awarm_up_ignores_failures(monkeypatch):
+    """A failed warm-up request is logged, not raised."""
+    import asyncio
+    from types import SimpleNamespace
+
+    from qa_chain import awarm_up, chain
+
+    async def fail_list():
+        raise ConnectionError("offline")
+
+    fake_llm = SimpleNamespace(
+        root_async_client=SimpleNamespace(models=SimpleNamespace(list=fail_list))
+    )
+    monkeypatch.setattr(chain, "build_chain", lambda config: None)
+    monkeypatch.setattr(chain, "_get_llm", lambda model, temperature: fake_llm)
+
+    asyncio.run(awarm_up(DEFAULT_CONFIG))
+
+
+def test_answer_questions_batches_uncached_pairs(monkeypatch):
+    """Pairs needing the LLM share one batch call; order is preserved."""
+    from qa_chain import answer_questions, chain
+    from qa_chain.cache import get_response_cache
+    from qa_chain.prompts import NO_ANSWER
+
+    class BatchChain:
+        def __init__(self):
+            self.calls = []
+
+        def batch(self, inputs, config=None, return_exceptions=False):
+            self.calls.append((inputs, config))
+            return [f"<b>{item['question']}</b>" for item in inputs]
+
+    fake = BatchChain()
+    monkeypatch.setattr(chain, "build_chain", lambda config: fake)
+    get_response_cache().clear()
+    cfg = QAConfig(temperature=0.0, enable_rate_limiting=False)
+
+    answers = answer_questions(
+        [("Q1?", "Context one."), ("Q2?", "tiny"), ("Q3?", "Context three.")],
+        cfg,
+        max_concurrency=4,
+    )
+
+    assert answers == ["Q1?", NO_ANSWER, "Q3?"]
+    assert len(fake.calls) == 1
+    inputs, batch_config = fake.calls[0]
+    assert [item["question"] for item in inputs] == ["Q1?", "Q3?"]
+    assert batch_config == {"max_concurrency": 4}
+
+    get_response_cache().clear()
+
+
+def test_build_prompt_is_cached():
+    """The prompt template is built once and shared."""
+    from qa_chain import chain
+    from qa_chain.prompts import build_prompt
+
+    assert build_prompt() is build_prompt()
+    assert chain._PROMPT is build_prompt()
+
+
+def test_prompt_puts_context_before_question():
+    """Context forms a stable prefix; the question comes last."""
+    from qa_chain.prompts import build_prompt
+
+    messages = build_prompt().format_messages(question="Q?", context="Doc.")
+    assert [m.type for m in messages] == ["system", "human", "human"]
+    assert messages[1].content == "Context:\nDoc."
+    assert messages[2].content.startswith("Question: Q?")
+
+
+def test_rate_limit_is_checked_before_validation(monkeypatch, tight_rate_limit):
+    """Throttled callers are rejected before their inputs are inspected."""
+    from qa_chain import SecurityError, chain
+
+    def fail_validate(question, context):
+        raise AssertionError("inputs should not be validated")
+
+    cfg = QAConfig(rate_limit_identifier="rate-first")
+    chain.check_rate_limit(cfg.rate_limit_identifier)
+    monkeypatch.setattr(chain, "validate_input", fail_validate)
+
+    with pytest.raises(SecurityError, match="Rate limit exceeded"):
+        answer_question("Q?", "Some context here.", cfg)
+
+
+def test_config_is_validated_once(monkeypatch):
+    """validate_config runs once per distinct config tuple."""
+    from qa_chain import chain
+
+    calls = []
+    monkeypatch.setattr(chain, "validate_config", calls.append)
+    monkeypatch.setattr(chain, "_validated_configs", set())
+
+    cfg = QAConfig(temperature=0.2, enable_rate_limiting=False)
+    for _ in range(3):
+        chain._validate_request("Q?", "Some context here.", cfg)
+
+    assert calls == [cfg]
+
+
+def test_aclose_clients_replaces_the_async_pool(monkeypatch):
+    """Closing the async pool leaves a fresh one for later requests."""
+    import asyncio
+
+    from qa_chain import aclose_clients, chain
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test1234567890")
+    old = chain._AHTTP_CLIENT
+    chain._get_llm("gpt-4o-mini", 0.0)
+
+    asyncio.run(aclose_clients())
+
+    assert old.is_closed
+    assert not chain._AHTTP_CLIENT.is_closed
+    assert chain._get_llm.cache_info().currsize == 0
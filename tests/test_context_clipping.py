@@ -33,3 +33,64 @@ def test_clip_context_with_multiple_terminators():
     # Should keep up to "Third sentence."
     assert result.endswith(".")
     assert "Third sentence." in result
+
+
+def test_clip_context_ignores_terminator_outside_tail():
+    """Test terminators more than 200 chars before the limit are not used."""
+    context = "Early sentence. " + "C" * 400
+    result = _clip_context(context, 300)
+    assert result == context[:300]
+
+
+def test_clip_context_terminator_space_past_limit():
+    """Test a terminator whose trailing space falls past the limit is ignored."""
+    context = "A" * 50 + ". " + "B" * 97 + ". " + "C" * 100
+    result = _clip_context(context, 150)
+    assert result == "A" * 50 + "."
+
+
+class _WordEncoding:
+    """Stand-in tokenizer with one token per space-separated word."""
+
+    def encode_ordinary(self, text):
+        return text.split(" ")
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def test_clip_context_tokens(monkeypatch):
+    """Test token clipping cuts to the token budget at a sentence boundary."""
+    from qa_chain import chain
+
+    monkeypatch.setattr(chain, "_encoding_for", lambda model: _WordEncoding())
+    context = "One two three. Four five six. Seven eight nine."
+
+    assert chain._clip_context_tokens(context, 20, "gpt-4o-mini") == context
+    assert chain._clip_context_tokens(context, 7, "gpt-4o-mini") == (
+        "One two three. Four five six."
+    )
+    assert chain._clip_context_tokens("a b c d e", 3, "gpt-4o-mini") == "a b c"
+
+
+def test_count_prompt_tokens_reuses_template_tokens(monkeypatch):
+    """Test fixed prompt text is tokenized once per model."""
+    from qa_chain import chain
+
+    encoded = []
+
+    class CountingEncoding(_WordEncoding):
+        def encode_ordinary(self, text):
+            encoded.append(text)
+            return super().encode_ordinary(text)
+
+    monkeypatch.setattr(chain, "_encoding_for", lambda model: CountingEncoding())
+    chain._prompt_overhead_tokens.cache_clear()
+
+    first = chain.count_prompt_tokens("Who?", "Alice did it.", "gpt-4o-mini")
+    calls = len(encoded)
+    second = chain.count_prompt_tokens("Who?", "Alice did it.", "gpt-4o-mini")
+
+    assert first == second
+    assert len(encoded) - calls == 2  # only the question and context
+    chain._prompt_overhead_tokens.cache_clear()
@@ -1,11 +1,20 @@
 """Tests for logging functionality."""
 
-import json
+import asyncio
 import logging
+import mmap
+import os
+import threading
 import time
+from pathlib import Path
 
 import pytest
 
+try:
+    from orjson import loads as jloads
+except ImportError:  # pragma: no cover - optional dependency
+    from json import loads as jloads  # type: ignore[assignment]
+
 from qa_chain.config import QAConfig
 from qa_chain.debug_utils import (
     DebugContext,
@@ -17,10 +26,12 @@ from qa_chain.debug_utils import (
     trace_llm_call,
 )
 from qa_chain.logging_config import (
+    BufferedFileHandler,
     LogContext,
     StructuredFormatter,
     get_logger,
     log_execution_time,
+    log_fields_var,
     log_with_context,
     request_id_var,
     setup_logging,
@@ -28,96 +39,133 @@ from qa_chain.logging_config import (
 )
 
 
+def read_jsonl(path):
+    """Parse a JSON-lines file, finding line ends in a memory map of it."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            records = []
+            start = 0
+            while (end := mm.find(b"\n", start)) != -1:
+                records.append(jloads(mm[start:end]))
+                start = end + 1
+            return records
+
+
+@pytest.fixture(scope="module")
+def log_dir(tmp_path_factory):
+    """One directory shared by the module; each test uses its own file name."""
+    return tmp_path_factory.mktemp("logs", numbered=False)
+
+
+@pytest.fixture
+def record():
+    """An INFO record from logger "test", built from a dict of its fields."""
+    return logging.makeLogRecord(
+        {
+            "name": "test",
+            "levelname": "INFO",
+            "levelno": logging.INFO,
+            "pathname": "test.py",
+            "module": "test",
+            "lineno": 10,
+            "msg": "Test message",
+        }
+    )
+
+
 class TestStructuredFormatter:
     """Test structured logging formatter."""
 
-    def test_format_basic_message(self):
+    def test_format_basic_message(self, record):
         """Test basic log message formatting."""
         formatter = StructuredFormatter()
-        record = logging.LogRecord(
-            name="test",
-            level=logging.INFO,
-            pathname="test.py",
-            lineno=10,
-            msg="Test message",
-            args=(),
-            exc_info=None,
-        )
 
         result = formatter.format(record)
-        data = json.loads(result)
+        data = jloads(result)
 
         assert data["level"] == "INFO"
         assert data["logger"] == "test"
         assert data["message"] == "Test message"
         assert data["line"] == 10
 
-    def test_format_with_request_id(self):
+    def test_format_with_request_id(self, record):
         """Test formatting with request ID context."""
         formatter = StructuredFormatter()
         request_id = "test-request-123"
 
         token = request_id_var.set(request_id)
         try:
-            record = logging.LogRecord(
-                name="test",
-                level=logging.INFO,
-                pathname="test.py",
-                lineno=10,
-                msg="Test message",
-                args=(),
-                exc_info=None,
-            )
-
             result = formatter.format(record)
-            data = json.loads(result)
+            data = jloads(result)
 
             assert data["request_id"] == request_id
         finally:
             request_id_var.reset(token)
 
-    def test_format_with_extra_fields(self):
+    def test_format_with_extra_fields(self, record):
         """Test formatting with extra fields."""
         formatter = StructuredFormatter()
-        record = logging.LogRecord(
-            name="test",
-            level=logging.INFO,
-            pathname="test.py",
-            lineno=10,
-            msg="Test message",
-            args=(),
-            exc_info=None,
-        )
         record.extra_fields = {"user_id": "123", "action": "test"}
 
         result = formatter.format(record)
-        data = json.loads(result)
+        data = jloads(result)
 
         assert data["user_id"] == "123"
         assert data["action"] == "test"
 
+    def test_format_non_json_extra_fields(self, record):
+        """Test extra fields JSON can't encode are logged as strings."""
+        formatter = StructuredFormatter()
+        record.extra_fields = {"path": Path("/tmp/x"), "sizes": {1: "one"}}
+
+        data = jloads(formatter.format(record))
+
+        assert data["path"] == str(Path("/tmp/x"))
+        assert data["sizes"] == {"1": "one"}
+
+    def test_format_line_is_encoded_json_line(self, record):
+        """Test format_line returns the same JSON as format, as a bytes line."""
+        formatter = StructuredFormatter()
+        record.extra_fields = {"city": "Zürich"}
 
+        line = formatter.format_line(record)
+
+        assert line.endswith(b"\n")
+        assert jloads(line) == jloads(formatter.format(record))
+
+    def test_timestamp_reused_within_a_second(self):
+        """Test that the timestamp string is cached per second."""
+        formatter = StructuredFormatter()
+        created = time.time()
+
+        first = formatter._timestamp(created)
+        assert formatter._timestamp(created) is first
+        assert first == time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(int(created)))
+        assert formatter._timestamp(created + 1) != first
+
+
+@pytest.mark.usefixtures("isolated_root_logger")
 class TestLoggingSetup:
     """Test logging setup and configuration."""
 
-    def test_setup_logging_json_format(self, tmp_path):
+    def test_setup_logging_json_format(self, log_dir):
         """Test setting up JSON formatted logging."""
-        log_file = tmp_path / "test.log"
+        log_file = log_dir / "json_format.log"
         setup_logging("INFO", "json", str(log_file))
 
         logger = get_logger("test")
         logger.info("Test message")
 
         # Check log file
-        with open(log_file) as f:
-            line = f.readline()
-            data = json.loads(line)
-            assert data["level"] == "INFO"
-            assert data["message"] == "Test message"
+        data = read_jsonl(log_file)[0]
+        assert data["level"] == "INFO"
+        assert data["message"] == "Test message"
 
-    def test_setup_logging_simple_format(self, tmp_path):
+    def test_setup_logging_simple_format(self, log_dir):
         """Test setting up simple formatted logging."""
-        log_file = tmp_path / "test.log"
+        log_file = log_dir / "simple_format.log"
         setup_logging("DEBUG", "simple", str(log_file))
 
         logger = get_logger("test")
@@ -129,6 +177,18 @@ class TestLoggingSetup:
             assert "DEBUG" in content
             assert "Debug message" in content
 
+    def test_setup_logging_buffered_file(self, log_dir):
+        """Test buffered file output is written once flushed."""
+        log_file = log_dir / "buffered.log"
+        setup_logging("INFO", "json", str(log_file), buffer_bytes=65536)
+        handler = logging.getLogger().handlers[0]
+        assert isinstance(handler, BufferedFileHandler)
+
+        get_logger("test").info("Buffered message")
+        handler.flush()
+
+        assert read_jsonl(log_file)[0]["message"] == "Buffered message"
+
     def test_get_logger(self):
         """Test getting a logger instance."""
         logger = get_logger("test.module")
@@ -152,6 +212,21 @@ class TestLoggingDecorators:
         # Check context is cleared after function
         assert request_id_var.get() is None
 
+    def test_with_request_id_restored_after_error(self):
+        """Test the outer request ID survives an exception in the call."""
+
+        @with_request_id("inner")
+        def test_func():
+            raise ValueError("boom")
+
+        token = request_id_var.set("outer")
+        try:
+            with pytest.raises(ValueError):
+                test_func()
+            assert request_id_var.get() == "outer"
+        finally:
+            request_id_var.reset(token)
+
     def test_with_request_id_auto_generate(self):
         """Test request ID decorator with auto-generation."""
 
@@ -180,9 +255,10 @@ class TestLoggingDecorators:
     def test_log_execution_time_decorator(self, caplog):
         """Test execution time logging decorator."""
 
-        @log_execution_time()
+        ticks = iter([0, 25_000_000])
+
+        @log_execution_time(clock=lambda: next(ticks))
         def test_func():
-            time.sleep(0.01)
             return "result"
 
         with caplog.at_level(logging.INFO):
@@ -190,6 +266,8 @@ class TestLoggingDecorators:
 
         assert result == "result"
         assert "Completed test_func" in caplog.text
+        record = next(r for r in caplog.records if r.msg == "Completed test_func")
+        assert record.extra_fields == {"execution_time_ms": 25}
 
     def test_log_execution_time_with_error(self, caplog):
         """Test execution time logging with error."""
@@ -221,6 +299,49 @@ class TestLogContext:
         except Exception as e:
             pytest.fail(f"LogContext raised an exception: {e}")
 
+    def test_log_context_fields_reach_records(self, caplog):
+        """Test that fields are formatted inside the block and removed after."""
+        logger = get_logger("test.log_context")
+        formatter = StructuredFormatter()
+
+        with caplog.at_level(logging.INFO, logger="test.log_context"):
+            with LogContext(logger, user_id="123"):
+                logger.info(
+                    "Inside", extra={"extra_fields": {"step": 1, "user_id": "x"}}
+                )
+                inside = jloads(formatter.format(caplog.records[-1]))
+            logger.info("Outside")
+            outside = jloads(formatter.format(caplog.records[-1]))
+
+        # Context fields win over the record's own extra_fields
+        assert inside["user_id"] == "123"
+        assert inside["step"] == 1
+        assert "user_id" not in outside
+        assert not logger.filters
+
+    def test_log_context_is_isolated_between_tasks(self, caplog):
+        """Test that concurrent requests sharing a logger keep their own fields."""
+        logger = get_logger("test.log_context")
+        formatter = StructuredFormatter()
+        seen = {}
+
+        async def request(name):
+            with LogContext(logger, request=name):
+                await asyncio.sleep(0)
+                logger.info(name)
+                seen[name] = jloads(formatter.format(caplog.records[-1]))
+
+        async def run():
+            await asyncio.gather(request("a"), request("b"))
+            # The shared default is read-only, so no request can leak into it
+            assert dict(log_fields_var.get()) == {}
+
+        with caplog.at_level(logging.INFO, logger="test.log_context"):
+            asyncio.run(run())
+
+        assert seen["a"]["request"] == "a"
+        assert seen["b"]["request"] == "b"
+
 
 class TestDebugUtilities:
     """Test debug utilities."""
@@ -240,6 +361,15 @@ class TestDebugUtilities:
         assert "Debug checkpoint: end" in caplog.text
         assert "Debug context completed" in caplog.text
 
+    def test_debug_context_skips_checkpoints_when_debug_disabled(self, caplog):
+        """Test that checkpoints are not recorded unless DEBUG is enabled."""
+        with caplog.at_level(logging.INFO):
+            with DebugContext() as ctx:
+                ctx.checkpoint("start", {"step": 1})
+
+        assert ctx.checkpoints == []
+        assert "Debug checkpoint" not in caplog.text
+
     def test_debug_config(self):
         """Test config debugging."""
         config = QAConfig(model="gpt-4", temperature=0.5)
@@ -264,6 +394,18 @@ class TestDebugUtilities:
         assert "LLM call started: mock_llm_call" in caplog.text
         assert "LLM call completed: mock_llm_call" in caplog.text
 
+    def test_trace_llm_call_silent_when_debug_disabled(self, caplog):
+        """Test successful calls log nothing when DEBUG is off."""
+
+        @trace_llm_call
+        def mock_llm_call(prompt: str) -> str:
+            return "response"
+
+        with caplog.at_level(logging.INFO):
+            assert mock_llm_call("test prompt") == "response"
+
+        assert caplog.records == []
+
     def test_trace_llm_call_error(self, caplog):
         """Test LLM call tracing for failed calls."""
 
@@ -306,10 +448,10 @@ class TestDebugUtilities:
         assert "Debug message in debug mode" in caplog.text
         assert "Debug mode disabled" in caplog.text
 
-    def test_dump_debug_info(self, tmp_path):
+    def test_dump_debug_info(self, log_dir):
         """Test dumping debug info to file."""
         config = QAConfig(enable_debug_mode=True)
-        debug_file = tmp_path / "debug.json"
+        debug_file = log_dir / "debug.json"
 
         dump_debug_info(
             question="What is AI?",
@@ -323,15 +465,84 @@ class TestDebugUtilities:
         assert debug_file.exists()
 
         with open(debug_file) as f:
-            data = json.load(f)
+            data = jloads(f.read())
             assert data["execution_time"] == 1.23
             assert data["input"]["question"] == "What is AI?"
             assert data["output"]["answer"] == "AI stands for artificial intelligence."
 
-    def test_dump_debug_info_disabled(self, tmp_path):
+    def test_dump_debug_info_msgpack(self, log_dir):
+        """Test dumping debug info in the binary msgpack format."""
+        msgpack = pytest.importorskip("msgpack")
+        config = QAConfig(enable_debug_mode=True)
+        debug_file = log_dir / "debug.msgpack"
+
+        dump_debug_info(
+            question="What is AI?",
+            context="AI is artificial intelligence.",
+            answer="AI stands for artificial intelligence.",
+            config=config,
+            execution_time=1.23,
+            filename=str(debug_file),
+            dump_format="msgpack",
+        )
+
+        data = msgpack.unpackb(debug_file.read_bytes())
+        assert data["execution_time"] == 1.23
+        assert data["input"]["question"] == "What is AI?"
+        assert data["output"]["answer"] == "AI stands for artificial intelligence."
+
+    def test_dump_debug_info_background(self, log_dir):
+        """Test debug dumping on the background writer thread."""
+        from qa_chain.debug_utils import wait_for_debug_dumps
+
+        config = QAConfig(enable_debug_mode=True)
+        debug_file = log_dir / "debug_bg.json"
+
+        dump_debug_info(
+            question="Q",
+            context="C",
+            answer="A",
+            config=config,
+            execution_time=0.5,
+            filename=str(debug_file),
+            background=True,
+        )
+        wait_for_debug_dumps()
+
+        with open(debug_file) as f:
+            assert jloads(f.read())["output"]["answer"] == "A"
+
+    def test_background_writer_survives_encoding_errors(self, log_dir, caplog):
+        """Test a dump that can't be serialized is logged and later dumps still run."""
+        from qa_chain import debug_utils
+
+        bad_file = log_dir / "debug_bad.json"
+        debug_file = log_dir / "debug_after_bad.json"
+
+        debug_utils._start_dump_writer()
+        debug_utils._dump_queue.put((str(bad_file), {"value": object()}, "json"))
+        dump_debug_info(
+            question="Q",
+            context="C",
+            answer="A",
+            config=QAConfig(enable_debug_mode=True),
+            execution_time=0.5,
+            filename=str(debug_file),
+            background=True,
+        )
+        waiter = threading.Thread(target=debug_utils.wait_for_debug_dumps)
+        waiter.start()
+        waiter.join(timeout=5)
+
+        assert not waiter.is_alive()
+        assert not bad_file.exists()
+        assert debug_file.exists()
+        assert "Failed to dump debug info" in caplog.text
+
+    def test_dump_debug_info_disabled(self, log_dir):
         """Test debug dumping when disabled."""
         config = QAConfig(enable_debug_mode=False)
-        debug_file = tmp_path / "debug.json"
+        debug_file = log_dir / "debug_disabled.json"
 
         dump_debug_info(
             question="Test",
@@ -361,7 +572,7 @@ class TestDebugStats:
 
         assert len(stats.stats["latency"]) == 3
         assert len(stats.stats["tokens"]) == 2
-        assert stats.stats["latency"] == [100, 150, 200]
+        assert list(stats.stats["latency"]) == [100, 150, 200]
 
     def test_log_summary(self):
         """Test logging summary statistics."""
@@ -1,5 +1,6 @@
 """Tests for retry functionality."""
 
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
@@ -12,6 +13,53 @@ from qa_chain.retry import (
     retry_with_exponential_backoff,
 )
 
+# Backoff waits are patched out, so the module is cheap; keeping it on one
+# xdist worker builds its module-scoped fixtures once
+pytestmark = pytest.mark.xdist_group("retry")
+
+
+class Outcomes:
+    """Callable that returns, or raises, the given outcomes in order.
+
+    The last outcome repeats once the others are used up. Cheaper than a
+    `MagicMock` with ``side_effect`` and only tracks ``call_count``.
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = outcomes
+        self.call_count = 0
+
+    def __call__(self, *args, **kwargs):
+        outcome = self.outcomes[min(self.call_count, len(self.outcomes) - 1)]
+        self.call_count += 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def backoff_waits(monkeypatch):
+    """Record synchronous backoff delays instead of waiting them out.
+
+    Waits still report an `interrupt_retries` call, like the real wait.
+    """
+    from qa_chain import retry
+
+    waits = []
+
+    def fake_wait(delay):
+        waits.append(delay)
+        return retry._shutdown.is_set()
+
+    monkeypatch.setattr(retry._shutdown, "wait", fake_wait)
+    return waits
+
+
+@pytest.fixture(scope="module")
+def default_policy():
+    """A default RetryPolicy, shared since tests only read from it."""
+    return RetryPolicy()
+
 
 class TestExponentialBackoff:
     """Test exponential backoff calculation."""
@@ -28,22 +76,33 @@ class TestExponentialBackoff:
         assert (
             exponential_backoff(10, base_delay=1.0, max_delay=5.0, jitter=False) == 5.0
         )
+        # Exponents past the float range are capped rather than overflowing
+        assert exponential_backoff(5000, max_delay=5.0, jitter=False) == 5.0
 
-    def test_jitter(self):
-        """Test that jitter adds randomness."""
+    def test_jitter(self, monkeypatch):
+        """Test that jitter scales the delay by up to 25%."""
         # Without jitter, delays should be consistent
         delay1 = exponential_backoff(2, base_delay=1.0, jitter=False)
         delay2 = exponential_backoff(2, base_delay=1.0, jitter=False)
         assert delay1 == delay2 == 4.0
 
-        # With jitter, delays should vary
-        delays_with_jitter = [
-            exponential_backoff(2, base_delay=1.0, jitter=True) for _ in range(10)
-        ]
-        # All should be between 4.0 and 5.0 (4.0 + up to 25% jitter)
-        assert all(4.0 <= d <= 5.0 for d in delays_with_jitter)
-        # Should have some variation
-        assert len(set(delays_with_jitter)) > 1
+        # With jitter, a fixed random draw gives an exact delay
+        monkeypatch.setattr("qa_chain.retry.random.random", lambda: 0.5)
+        assert exponential_backoff(2, base_delay=1.0, jitter=True) == 4.5
+
+    def test_decorrelated_strategy(self):
+        """Test decorrelated delays grow from the previous delay and are capped."""
+        for _ in range(20):
+            delay = exponential_backoff(
+                3, base_delay=1.0, strategy="decorrelated", prev_delay=2.0
+            )
+            assert 1.0 <= delay <= 6.0
+        assert (
+            exponential_backoff(
+                0, max_delay=5.0, strategy="decorrelated", prev_delay=100.0
+            )
+            <= 5.0
+        )
 
 
 class TestRetriableError:
@@ -68,29 +127,30 @@ class TestRetriableError:
         assert not is_retriable_error(KeyError("Missing key"))
         assert not is_retriable_error(Exception("Authentication failed"))
 
-    def test_api_error_with_status_code(self):
-        """Test API errors with status codes."""
-        # Mock an API error with response
+    @pytest.mark.parametrize("code", [429, 500, 502, 503, 504])
+    def test_api_error_with_retriable_status_code(self, code):
+        """Test API errors with retriable status codes."""
         error = Exception("API Error")
-        error.response = MagicMock()
+        error.response = SimpleNamespace(status_code=code)
 
-        # Retriable status codes
-        for code in [429, 500, 502, 503, 504]:
-            error.response.status_code = code
-            assert is_retriable_error(error)
+        assert is_retriable_error(error)
+
+    @pytest.mark.parametrize("code", [400, 401, 403, 404])
+    def test_api_error_with_non_retriable_status_code(self, code):
+        """Test API errors with non-retriable status codes."""
+        error = Exception("API Error")
+        error.response = SimpleNamespace(status_code=code)
 
-        # Non-retriable status codes
-        for code in [400, 401, 403, 404]:
-            error.response.status_code = code
-            assert not is_retriable_error(error)
+        assert not is_retriable_error(error)
 
 
+@pytest.mark.usefixtures("backoff_waits")
 class TestRetryDecorator:
     """Test retry decorator functionality."""
 
     def test_successful_first_attempt(self):
         """Test function that succeeds on first try."""
-        mock_func = MagicMock(return_value="success")
+        mock_func = Outcomes("success")
 
         @retry_with_exponential_backoff(max_attempts=3)
         def test_func():
@@ -100,29 +160,71 @@ class TestRetryDecorator:
         assert result == "success"
         assert mock_func.call_count == 1
 
-    def test_retry_on_failure(self):
+    def test_retry_on_failure(self, backoff_waits):
         """Test function that fails then succeeds."""
-        mock_func = MagicMock(
-            side_effect=[
-                ConnectionError("Failed"),
-                ConnectionError("Failed"),
-                "success",
-            ]
+        mock_func = Outcomes(
+            ConnectionError("Failed"),
+            ConnectionError("Failed"),
+            "success",
         )
 
-        @retry_with_exponential_backoff(max_attempts=3, base_delay=0.01)
+        @retry_with_exponential_backoff(max_attempts=3)
         def test_func():
             return mock_func()
 
         result = test_func()
         assert result == "success"
         assert mock_func.call_count == 3
+        # 1s then 2s, each with up to 25% jitter
+        assert 1.0 <= backoff_waits[0] <= 1.25
+        assert 2.0 <= backoff_waits[1] <= 2.5
+
+    def test_decorrelated_retry_tracks_previous_delay(self, monkeypatch, backoff_waits):
+        """Test each decorrelated delay is drawn from the previous one."""
+        bounds = []
+
+        def fake_uniform(low, high):
+            bounds.append((low, high))
+            return high
+
+        monkeypatch.setattr("qa_chain.retry.random.uniform", fake_uniform)
+        mock_func = Outcomes(ConnectionError("Failed"), ConnectionError("Failed"), "ok")
+
+        @retry_with_exponential_backoff(
+            max_attempts=3, base_delay=1.0, strategy="decorrelated"
+        )
+        def test_func():
+            return mock_func()
+
+        assert test_func() == "ok"
+        assert bounds == [(1.0, 3.0), (1.0, 9.0)]
+        assert backoff_waits == [3.0, 9.0]
 
-    def test_exhaust_retries(self):
+    def test_interrupted_backoff_raises(self):
+        """Test interrupt_retries stops a pending backoff immediately."""
+        from qa_chain.retry import interrupt_retries, resume_retries
+
+        mock_func = Outcomes(ConnectionError("Failed"))
+
+        @retry_with_exponential_backoff(max_attempts=3, base_delay=60.0)
+        def test_func():
+            return mock_func()
+
+        interrupt_retries()
+        try:
+            with pytest.raises(RetryError, match="interrupted") as exc_info:
+                test_func()
+        finally:
+            resume_retries()
+
+        assert mock_func.call_count == 1
+        assert isinstance(exc_info.value.last_error, ConnectionError)
+
+    def test_exhaust_retries(self, backoff_waits):
         """Test function that exhausts all retries."""
-        mock_func = MagicMock(side_effect=ConnectionError("Always fails"))
+        mock_func = Outcomes(ConnectionError("Always fails"))
 
-        @retry_with_exponential_backoff(max_attempts=3, base_delay=0.01)
+        @retry_with_exponential_backoff(max_attempts=3)
         def test_func():
             return mock_func()
 
@@ -131,10 +233,12 @@ class TestRetryDecorator:
 
         assert "Failed after 3 attempts" in str(exc_info.value)
         assert mock_func.call_count == 3
+        # No wait after the final attempt
+        assert len(backoff_waits) == 2
 
     def test_non_retriable_error(self):
         """Test that non-retriable errors are raised immediately."""
-        mock_func = MagicMock(side_effect=ValueError("Bad value"))
+        mock_func = Outcomes(ValueError("Bad value"))
 
         @retry_with_exponential_backoff(max_attempts=3)
         def test_func():
@@ -152,10 +256,10 @@ class TestRetryDecorator:
         class CustomError(Exception):
             pass
 
-        mock_func = MagicMock(side_effect=[CustomError("Failed"), "success"])
+        mock_func = Outcomes(CustomError("Failed"), "success")
 
         @retry_with_exponential_backoff(
-            max_attempts=3, base_delay=0.01, retriable_exceptions=(CustomError,)
+            max_attempts=3, retriable_exceptions=(CustomError,)
         )
         def test_func():
             return mock_func()
@@ -167,11 +271,9 @@ class TestRetryDecorator:
     def test_on_retry_callback(self):
         """Test on_retry callback is called."""
         callback_mock = MagicMock()
-        mock_func = MagicMock(side_effect=[ConnectionError("Failed"), "success"])
+        mock_func = Outcomes(ConnectionError("Failed"), "success")
 
-        @retry_with_exponential_backoff(
-            max_attempts=3, base_delay=0.01, on_retry=callback_mock
-        )
+        @retry_with_exponential_backoff(max_attempts=3, on_retry=callback_mock)
         def test_func():
             return mock_func()
 
@@ -185,16 +287,16 @@ class TestRetryDecorator:
         assert call_args[1] == 1  # First retry
 
 
+@pytest.mark.usefixtures("backoff_waits")
 class TestRetryPolicy:
     """Test RetryPolicy class."""
 
-    def test_default_policy(self):
+    def test_default_policy(self, default_policy):
         """Test default retry policy."""
-        policy = RetryPolicy()
-        assert policy.max_attempts == 3
-        assert policy.base_delay == 1.0
-        assert policy.max_delay == 60.0
-        assert policy.jitter is True
+        assert default_policy.max_attempts == 3
+        assert default_policy.base_delay == 1.0
+        assert default_policy.max_delay == 60.0
+        assert default_policy.jitter is True
 
     def test_custom_policy(self):
         """Test custom retry policy."""
@@ -206,19 +308,18 @@ class TestRetryPolicy:
         assert policy.max_delay == 120.0
         assert policy.jitter is False
 
-    def test_should_retry(self):
+    def test_should_retry(self, default_policy):
         """Test should_retry logic."""
-        policy = RetryPolicy(max_attempts=3)
-
         # Should retry on retriable errors
         error = ConnectionError("Failed")
-        assert policy.should_retry(error, attempt=1)
-        assert policy.should_retry(error, attempt=2)
-        assert not policy.should_retry(error, attempt=3)  # Max attempts reached
+        assert default_policy.should_retry(error, attempt=1)
+        assert default_policy.should_retry(error, attempt=2)
+        # Max attempts reached
+        assert not default_policy.should_retry(error, attempt=3)
 
         # Should not retry on non-retriable errors
         error = ValueError("Bad value")
-        assert not policy.should_retry(error, attempt=1)
+        assert not default_policy.should_retry(error, attempt=1)
 
     def test_get_delay(self):
         """Test delay calculation."""
@@ -230,8 +331,8 @@ class TestRetryPolicy:
 
     def test_as_decorator(self):
         """Test converting policy to decorator."""
-        policy = RetryPolicy(max_attempts=2, base_delay=0.01)
-        mock_func = MagicMock(side_effect=[ConnectionError("Failed"), "success"])
+        policy = RetryPolicy(max_attempts=2)
+        mock_func = Outcomes(ConnectionError("Failed"), "success")
 
         @policy.as_decorator()
         def test_func():
@@ -241,25 +342,53 @@ class TestRetryPolicy:
         assert result == "success"
         assert mock_func.call_count == 2
 
+    def test_as_async_decorator(self, default_policy, monkeypatch):
+        """Test async retries await asyncio.sleep instead of blocking."""
+        import asyncio
+
+        mock_func = Outcomes(ConnectionError("Failed"), "success")
+        async_sleeps = []
 
+        @default_policy.as_async_decorator()
+        async def test_func():
+            return mock_func()
+
+        def fail_wait(delay):
+            raise AssertionError("the event loop must not be blocked")
+
+        async def fake_sleep(delay):
+            async_sleeps.append(delay)
+
+        monkeypatch.setattr("qa_chain.retry._shutdown.wait", fail_wait)
+        monkeypatch.setattr("qa_chain.retry.asyncio.sleep", fake_sleep)
+        result = asyncio.run(test_func())
+
+        assert result == "success"
+        assert mock_func.call_count == 2
+        assert len(async_sleeps) == 1
+
+    def test_as_async_decorator_rejects_sync_functions(self, default_policy):
+        """Test the async decorator only accepts coroutine functions."""
+        with pytest.raises(TypeError):
+            default_policy.as_async_decorator()(lambda: None)
+
+
+@pytest.mark.usefixtures("backoff_waits")
 class TestRetryWithChain:
     """Test retry with actual chain-like behavior."""
 
-    def test_chain_retry_integration(self):
+    def test_chain_retry_integration(self, default_policy):
         """Test retry with a mock chain."""
         # Mock a chain that fails twice then succeeds
-        mock_chain = MagicMock()
-        mock_chain.invoke = MagicMock(
-            side_effect=[
+        mock_chain = SimpleNamespace(
+            invoke=Outcomes(
                 ConnectionError("API unavailable"),
                 TimeoutError("Request timed out"),
                 "The answer is 42",
-            ]
+            )
         )
 
-        policy = RetryPolicy(max_attempts=3, base_delay=0.01)
-
-        @policy.as_decorator()
+        @default_policy.as_decorator()
         def invoke_chain(inputs):
             return mock_chain.invoke(inputs)
 
@@ -267,16 +396,13 @@ class TestRetryWithChain:
         assert result == "The answer is 42"
         assert mock_chain.invoke.call_count == 3
 
-    def test_chain_non_retriable_error(self):
+    def test_chain_non_retriable_error(self, default_policy):
         """Test chain with non-retriable error."""
-        mock_chain = MagicMock()
-        mock_chain.invoke = MagicMock(
-            side_effect=ValueError("Invalid model configuration")
+        mock_chain = SimpleNamespace(
+            invoke=Outcomes(ValueError("Invalid model configuration"))
         )
 
-        policy = RetryPolicy(max_attempts=3)
-
-        @policy.as_decorator()
+        @default_policy.as_decorator()
         def invoke_chain(inputs):
             return mock_chain.invoke(inputs)
 
@@ -1,10 +1,17 @@
 """Test compliance with challenge spec requirements."""
 
+import inspect
 import os
+import subprocess
+import sys
 
 import pytest
 
 from qa_chain import answer_question
+from qa_chain.chain import _normalize_text, _preprocess
+
+# Signature of the public entry point, shared by the signature checks
+ANSWER_QUESTION_SIGNATURE = inspect.signature(answer_question)
 
 
 class TestSpecCompliance:
@@ -16,10 +23,8 @@ class TestSpecCompliance:
         assert callable(answer_question)
 
         # Verify function can be imported and has correct signature
-        import inspect
-
-        sig = inspect.signature(answer_question)
-        params = list(sig.parameters.keys())
+        sig = ANSWER_QUESTION_SIGNATURE
+        params = list(sig.parameters)
 
         # First two parameters should be question and context
         assert params[0] == "question"
@@ -47,10 +52,7 @@ class TestSpecCompliance:
         # Preprocessing is comprehensively tested in test_preprocessing.py
         # This test verifies that preprocessing is part of the design
 
-        # Check that preprocessing functions exist
-        from qa_chain.chain import _normalize_text, _preprocess
-
-        # Verify these are callable (they handle preprocessing)
+        # Verify the preprocessing functions exist and are callable
         assert callable(_normalize_text)
         assert callable(_preprocess)
 
@@ -95,8 +97,30 @@ def test_minimal_imports():
     assert callable(qa_func)
 
     # Should work without explicitly importing config
-    import inspect
-
-    sig = inspect.signature(qa_func)
+    assert qa_func is answer_question
+    sig = ANSWER_QUESTION_SIGNATURE
     assert "config" in sig.parameters
     assert sig.parameters["config"].default is None
+
+
+def test_all_matches_lazy_exports():
+    """Every lazily exported name is listed in __all__, and vice versa."""
+    import qa_chain
+
+    assert sorted(qa_chain.__all__) == sorted(qa_chain._LAZY)
+
+
+def test_package_import_is_lazy():
+    """Importing qa_chain for its config does not load LangChain."""
+    code = (
+        "import sys, qa_chain; qa_chain.QAConfig(); "
+        "assert 'langchain_openai' not in sys.modules; "
+        "assert callable(qa_chain.answer_question)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": "src"},
+    )
+    assert result.returncode == 0, result.stderr